@@ -0,0 +1,577 @@
+import asyncio
+import io
+import itertools
+import json
+import logging
+import os
+import re
+from collections import deque
+from functools import partial
+
+from jinja2 import Environment
+from jinja2 import FileSystemLoader
+from werkzeug.datastructures import Headers
+from werkzeug.exceptions import HTTPException
+from werkzeug.exceptions import InternalServerError
+from werkzeug.exceptions import MethodNotAllowed
+from werkzeug.exceptions import NotFound
+from werkzeug.wrappers import Request
+from werkzeug.wrappers import Response
+
+import cb_edp.config.constants as const
+import cb_edp.config.messages as msg
+from cb_edp.api.main import build_cache_key
+from cb_edp.api.main import build_headers
+from cb_edp.api.main import build_next_url
+from cb_edp.api.main import build_orion_params
+from cb_edp.api.main import build_query
+from cb_edp.api.main import check_if_complete_request
+from cb_edp.api.main import get_page_entities
+from cb_edp.api.main import join_pages
+from cb_edp.api.main import max_entities
+from cb_edp.api.main import page_sizes
+from cb_edp.api.main import page_workers
+from cb_edp.api.main import rdf_file
+from cb_edp.api.main import read_next_token
+from cb_edp.api.main import response_cache
+from cb_edp.api.main import streaming
+from cb_edp.errors.api import APIProcessError
+from cb_edp.errors.api import CouldNotReadRDFError
+from cb_edp.utils.helpers import Helpers
+from cb_edp.utils.sessions import AsyncSessionManager
+
+routes = []
+templates = Environment(loader=FileSystemLoader(os.path.join(os.path.dirname(__file__), 'templates')), autoescape=True)
+
+
+async def app(scope, receive, send):
+	"""
+	ASGI application serving the same routes as the Flask one, but waiting for Orion without blocking the process,
+	so a worker can have hundreds of calls to Orion in flight at the same time and slow downloads do not delay the
+	status and RDF endpoints.
+
+	:param dict scope: Connection scope
+	:param receive: Awaitable callable that returns the next event of the connection
+	:param send: Awaitable callable that sends an event to the client
+	:return: None
+	"""
+	if scope['type'] == 'lifespan':
+		await lifespan(receive, send)
+		return
+	if scope['type'] != 'http':
+		return
+
+	request = Request(build_environ(scope))
+	try:
+		response = await dispatch(request)
+	except (CouldNotReadRDFError, APIProcessError) as exception:
+		response = handle_custom_api_errors(exception)
+	except HTTPException as exception:
+		response = exception.get_response()
+	except Exception as error:
+		logging.exception(msg.API_ASYNC_REQUEST_FAILED.format(path=request.path, error=error))
+		response = InternalServerError().get_response()
+	await send_response(send, request.method, *make_response(response, request.environ))
+
+
+def route(path):
+	"""
+	Registers a view to be called when the path of a request matches the API URL structure with the route given.
+
+	:param str path: Regular expression of the route (its named groups are passed to the view)
+	:return: Decorator that registers the view
+	"""
+
+	def decorator(view):
+		routes.append((re.compile(const.API_ASYNC_URL_STRUCTURE.format(route=path)), view))
+		return view
+
+	return decorator
+
+
+@route(const.API_ASYNC_URL_ENTITY + const.API_ASYNC_URL_LOCATION)
+async def by_location(request, rel_path, orion, datamodel, location):
+	"""
+	Makes a query to Orion API filtering by an entity type and a geographical area.
+
+	:param Request request: Request object representing the one made by the user
+	:param str rel_path: Relative path from a regex where the API is located
+	:param str orion: Base64 encoded Orion host
+	:param str datamodel: Data Model (entity) by which the filter will be done
+	:param str location: Name of a geographical area (political location) to filter the query
+	:return: Query response to Orion API call
+	:rtype: (bytes or str or collections.abc.AsyncIterator[bytes], int, list[(str, str)])
+	"""
+	headers = build_headers(request)
+
+	orion_host = Helpers.decode_base64_url(orion)
+	orion_params = build_orion_params(request.args)
+	query = build_query(orion_host, datamodel, request, orion_params, location)
+	key = build_cache_key(orion_host, datamodel, location, headers, request, orion_params)
+	next_url = partial(build_next_url, rel_path, orion_host, datamodel, location, headers, orion_params)
+	return await make_cached_request(key, datamodel, query, headers, complete=check_if_complete_request(request),
+									 next_url=next_url, path=request.full_path)
+
+
+@route(const.API_ASYNC_URL_ENTITY)
+async def by_entity(request, rel_path, orion, datamodel):
+	"""
+	Makes a query to Orion API filtering by entity type.
+
+	:param Request request: Request object representing the one made by the user
+	:param str rel_path: Relative path from a regex where the API is located
+	:param str orion: Base64 encoded Orion host
+	:param str datamodel: Data Model (entity) by which the filter will be done
+	:return: Query response to Orion API call
+	:rtype: (bytes or str or collections.abc.AsyncIterator[bytes], int, list[(str, str)])
+	"""
+	headers = build_headers(request)
+
+	orion_host = Helpers.decode_base64_url(orion)
+	orion_params = build_orion_params(request.args)
+	query = build_query(orion_host, datamodel, request, orion_params)
+	key = build_cache_key(orion_host, datamodel, None, headers, request, orion_params)
+	next_url = partial(build_next_url, rel_path, orion_host, datamodel, None, headers, orion_params)
+	return await make_cached_request(key, datamodel, query, headers, complete=check_if_complete_request(request),
+									 next_url=next_url, path=request.full_path)
+
+
+@route(const.API_ASYNC_URL_NEXT)
+async def next_entities(request, rel_path, token):
+	"""
+	Makes the query of a complete request that had more entities than the maximum set in API settings, returning the
+	entities after the ones already returned.
+
+	:param Request request: Request object representing the one made by the user
+	:param str rel_path: Relative path from a regex where the API is located
+	:param str token: Continuation token given by the previous response
+	:return: Query response to Orion API call
+	:rtype: (bytes or str or collections.abc.AsyncIterator[bytes], int, list[(str, str)])
+	:raises APIProcessError:
+	"""
+	orion_host, datamodel, location, headers, orion_params, offset = read_next_token(token)
+	query = build_query(orion_host, datamodel, request, orion_params, location, offset)
+	key = build_cache_key(orion_host, datamodel, location, headers, request, orion_params, offset)
+	next_url = partial(build_next_url, rel_path, orion_host, datamodel, location, headers, orion_params)
+	return await make_cached_request(key, datamodel, query, headers, next_url=next_url, path=request.full_path)
+
+
+@route(re.escape(const.RDF_FILE_NAME))
+async def rdf(request, rel_path):
+	"""
+	Returns in request's response the RDF file generated by the integration, as the Flask API does.
+
+	:param Request request: Request object representing the one made by the user
+	:param str rel_path: Relative path from a regex where the API is located (its value is never used)
+	:return: Generated RDF/XML file
+	:rtype: Response
+	:raises CouldNotReadRDFError APIProcessError:
+	"""
+	try:
+		rdf_xml, encoding, etag, last_modified = rdf_file.get(request.accept_encodings)
+		response = Response(rdf_xml, mimetype='application/rdf+xml')
+		if encoding:
+			response.content_encoding = encoding
+		response.vary.add('Accept-Encoding')
+		response.set_etag(etag)
+		response.last_modified = last_modified
+		return response.make_conditional(request)
+	except CouldNotReadRDFError:
+		raise
+	except:
+		raise APIProcessError
+
+
+@route(re.escape(const.API_URL_STATUS))
+async def status(request, rel_path):
+	"""
+	Dummy method that returns a plain response just to check that the API works fine.
+
+	:param Request request: Request object representing the one made by the user
+	:param str rel_path: Relative path from a regex where the API is located (its value is never used)
+	:return: Plain empty response
+	:rtype: Response
+	"""
+	return Response(msg.API_STATUS_OK, mimetype='text/html')
+
+
+@route(re.escape(const.API_URL_CACHE_STATUS))
+async def cache_status(request, rel_path):
+	"""
+	Returns the counters of the cache of Orion responses kept by current API process.
+
+	:param Request request: Request object representing the one made by the user
+	:param str rel_path: Relative path from a regex where the API is located (its value is never used)
+	:return: JSON with cache hits, misses, entries and size
+	:rtype: Response
+	"""
+	return Response(json.dumps(response_cache.get_stats()), mimetype='application/json')
+
+
+def handle_custom_api_errors(exception):
+	"""
+	Exception handler for those custom errors produced by the Integration Solution API.
+
+	:param CouldNotReadRDFError or APIProcessError exception: Custom error raised by APIs methods
+	:return: Error page template with a brief error description
+	:rtype: Response
+	"""
+	page = templates.get_template('error.html').render(error_code=exception.status_code,
+													   title=exception.short_message, message=exception.message)
+	return Response(page, exception.status_code, mimetype='text/html')
+
+
+async def lifespan(receive, send):
+	"""
+	Handles the startup and shutdown events of the worker, opening and closing the session used to call Orion.
+
+	:param receive: Awaitable callable that returns the next event of the worker
+	:param send: Awaitable callable that answers the events of the worker
+	:return: None
+	"""
+	while True:
+		message = await receive()
+		if message['type'] == 'lifespan.startup':
+			try:
+				AsyncSessionManager.get_session()
+			except ImportError as error:
+				await send({'type': 'lifespan.startup.failed', 'message': str(error)})
+				return
+			await send({'type': 'lifespan.startup.complete'})
+		elif message['type'] == 'lifespan.shutdown':
+			await AsyncSessionManager.close()
+			await send({'type': 'lifespan.shutdown.complete'})
+			return
+
+
+def build_environ(scope):
+	"""
+	Builds from an ASGI connection scope the WSGI environment used by Werkzeug requests, so query arguments and headers
+	are parsed in the same way they are in the Flask API.
+
+	:param dict scope: Connection scope
+	:return: WSGI environment of the request (without body)
+	:rtype: dict
+	"""
+	server = scope.get('server') or ('localhost', 80)
+	environ = {
+		'REQUEST_METHOD': scope['method'],
+		'SCRIPT_NAME': '',
+		'PATH_INFO': scope['path'].encode('utf8').decode('latin1'),
+		'QUERY_STRING': scope['query_string'].decode('latin1'),
+		'SERVER_NAME': server[0],
+		'SERVER_PORT': str(server[1]),
+		'SERVER_PROTOCOL': 'HTTP/{version}'.format(version=scope['http_version']),
+		'wsgi.url_scheme': scope.get('scheme', 'http'),
+		'wsgi.input': io.BytesIO()
+	}
+	for name, value in scope['headers']:
+		name = name.decode('latin1').upper().replace('-', '_')
+		if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+			name = 'HTTP_' + name
+		value = value.decode('latin1')
+		environ[name] = environ[name] + ',' + value if name in environ else value
+	return environ
+
+
+async def dispatch(request):
+	"""
+	Calls the view whose route matches the path of the request.
+
+	:param Request request: Request object representing the one made by the user
+	:return: Value returned by the view
+	:rtype: Response or (bytes or str or collections.abc.AsyncIterator[bytes], int, list[(str, str)])
+	:raises NotFound MethodNotAllowed:
+	"""
+	for pattern, view in routes:
+		match = pattern.fullmatch(request.path)
+		if match is not None:
+			if request.method not in const.API_ASYNC_METHODS:
+				raise MethodNotAllowed(valid_methods=const.API_ASYNC_METHODS)
+			return await view(request, **match.groupdict())
+	raise NotFound
+
+
+def make_response(rv, environ):
+	"""
+	Converts the value returned by a view into the status code, headers and body sent to the client, as Flask does with
+	the values returned by its views. Hop-by-hop headers received from Orion are left out and the length of the
+	contents already built is computed again.
+
+	:param Response or tuple rv: Value returned by the view
+	:param dict environ: WSGI environment of the request
+	:return: Status code, headers and body (either the whole content or its chunks)
+	:rtype: (int, list[(bytes, bytes)], bytes or collections.abc.AsyncIterator[bytes])
+	"""
+	if not isinstance(rv, Response):
+		content, status_code, headers = rv
+		headers = Headers([(name, value) for name, value in headers
+						   if name.lower() not in const.API_ASYNC_HOP_BY_HOP_HEADERS])
+		if hasattr(content, '__aiter__'):
+			headers.remove('Content-Length')
+			headers.setdefault('Content-Type', 'application/json')
+			return status_code, encode_headers(headers.to_wsgi_list()), content
+		rv = Response(content, status_code, headers)
+	app_iter, status, headers = rv.get_wsgi_response(environ)
+	return int(status.split(' ', 1)[0]), encode_headers(headers), b''.join(app_iter)
+
+
+def encode_headers(headers):
+	"""
+	Encodes headers in the format used by ASGI.
+
+	:param list[(str, str)] headers: Headers to encode
+	:return: Lower case names and values of the headers as bytes
+	:rtype: list[(bytes, bytes)]
+	"""
+	return [(name.lower().encode('latin1'), value.encode('latin1')) for name, value in headers]
+
+
+async def send_response(send, method, status_code, headers, body):
+	"""
+	Sends a response to the client. Streamed bodies are sent chunk by chunk as they are generated (and not generated
+	at all when answering HEAD requests).
+
+	:param send: Awaitable callable that sends an event to the client
+	:param str method: HTTP method of the request
+	:param int status_code: Status code of the response
+	:param list[(bytes, bytes)] headers: Headers of the response
+	:param bytes or collections.abc.AsyncIterator[bytes] body: Content of the response
+	:return: None
+	"""
+	await send({'type': 'http.response.start', 'status': status_code, 'headers': headers})
+	if type(body) is bytes:
+		await send({'type': 'http.response.body', 'body': body})
+		return
+
+	try:
+		if method != 'HEAD':
+			async for chunk in body:
+				await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+	finally:
+		await body.aclose()
+	await send({'type': 'http.response.body', 'body': b''})
+
+
+async def make_cached_request(key, entity, query, headers, complete=True, next_url=None, path=None):
+	"""
+	Returns the response for a query from the cache or, if it is not there, makes it and caches its response.
+	Only successful responses are cached and their TTL depends on the periodicity of the entity's Data Model.
+
+	:param tuple key: Key of the query in the responses cache
+	:param str entity: Entity name by which the filter is done
+	:param OrionQuery query: Query to make
+	:param dict headers: Orion's required headers to make a proper API call
+	:param bool complete: Flag that indicates if the request should return every entity by the filter (default 'True')
+	:param next_url: Function returning the URL that continues the request from a given offset (default 'None')
+	:param str path: Path of the user's request, identifying it in the logs of streamed responses (default 'None')
+	:return: Query response to Orion API call
+	:rtype: (bytes or str or collections.abc.AsyncIterator[bytes], int, list[(str, str)])
+	"""
+	cached = response_cache.get(key)
+	if cached is not None:
+		content, status_code, response_headers = cached
+		return content, status_code, response_headers + [(const.API_CACHE_HEADER, 'HIT')]
+
+	content, status_code, response_headers = await make_request(query, headers, complete=complete,
+																next_url=next_url, path=path)
+	response_headers = list(response_headers)
+	if status_code == 200:
+		ttl = response_cache.get_ttl(entity)
+		if hasattr(content, '__aiter__'):
+			content = response_cache.tee_async(key, content, status_code, response_headers, ttl)
+		else:
+			response_cache.set(key, content, status_code, response_headers, ttl)
+	return content, status_code, response_headers + [(const.API_CACHE_HEADER, 'MISS')]
+
+
+async def make_request(query, headers, method='get', complete=True, next_url=None, path=None):
+	"""
+	Makes a query and returns its response, capping complete requests as the Flask API does.
+
+	:param OrionQuery query: Query to make
+	:param dict headers: Orion's required headers to make a proper API call
+	:param str method: HTTP method used in the request (default 'get')
+	:param bool complete: Flag that indicates if the request should return every entity by the filter (default 'True')
+	:param next_url: Function returning the URL that continues the request from a given offset (default 'None')
+	:param str path: Path of the user's request, identifying it in the logs of streamed responses (default 'None')
+	:return: Query response to Orion API call (streamed when it is complete and streaming is enabled in API settings)
+	:rtype: (bytes or str or collections.abc.AsyncIterator[bytes], int, list[(str, str)])
+	"""
+	if complete:
+		response, limit = await request_first_page(query, headers, method)
+	else:
+		response = await AsyncSessionManager.request(method, query.get_url(), headers=headers)
+	content = await response.read()
+	response_headers = Headers(list(response.headers.items()))
+	if complete and const.API_FIWARE_TOTAL_COUNT_HEADER in response.headers:
+		start = int(query.params['offset'])
+		count = int(response.headers[const.API_FIWARE_TOTAL_COUNT_HEADER])
+		stop = min(count, start + max_entities) if max_entities else count
+		if stop < count and next_url:
+			logging.info(msg.API_ENTITIES_CAPPED.format(url=query.get_url(), offset=start, stop=stop, count=count))
+			response_headers['Link'] = const.API_LINK_NEXT.format(url=next_url(stop))
+		if stop > start + limit:
+			offsets = range(start + limit, stop, limit)
+			response_headers.pop('Content-Length', None)
+			if streaming:
+				pages = iter_pages(query, headers, method, offsets)
+				try:
+					first_pages = [get_page_entities(content, query), get_page_entities(await pages.__anext__(), query)]
+				except BaseException:
+					await pages.aclose()
+					raise
+				content = stream_pages(first_pages, pages, query, path)
+			else:
+				content = json.loads(content)
+				async for page in iter_pages(query, headers, method, offsets):
+					content += json.loads(page)
+				content = json.dumps(content)
+
+	# Headers removal when gzip content returned to avoid encoding misunderstandings
+	for header in const.API_FIWARE_RESPONSE_IGNORE_HEADERS:
+		if header in response_headers:
+			response_headers.pop(header)
+
+	return content, response.status, response_headers.items()
+
+
+async def request_first_page(query, headers, method):
+	"""
+	Makes the query for the first page of a complete request asking for as many entities as the page size of its
+	Orion host, as the Flask API does.
+
+	:param OrionQuery query: Query to make (its limit parameter will be replaced by the page size)
+	:param dict headers: Orion's required headers to make a proper API call
+	:param str method: HTTP method used in the request
+	:return: Query response to Orion API call and number of entities asked for
+	:rtype: (aiohttp.ClientResponse, int)
+	:raises aiohttp.ClientError asyncio.TimeoutError:
+	"""
+	host = query.host
+	limit = min(page_sizes.get(host), max_entities) if max_entities else page_sizes.get(host)
+	while True:
+		try:
+			response = await AsyncSessionManager.request(method, query.get_url(limit=limit), headers=headers)
+		except asyncio.TimeoutError:
+			smaller = page_sizes.reduce(host, limit, msg.API_PAGE_SIZE_REASON_TIMEOUT)
+			if smaller is None:
+				raise
+			limit = smaller
+			continue
+
+		if response.status == 200:
+			page_sizes.accept(host, limit, len(await response.read()))
+		elif response.status == 400 and not page_sizes.is_probed(host) and page_sizes.is_size_rejected(
+				limit, await response.read()):
+			smaller = page_sizes.get_smaller(limit)
+			if smaller is not None:
+				logging.info(msg.API_PAGE_SIZE_REJECTED.format(host=host, size=limit, reason=response.status,
+															   new_size=smaller))
+				limit = smaller
+				continue
+		return response, limit
+
+
+async def stream_pages(first_pages, pages, query, path):
+	"""
+	Generates the body of a complete request as a single JSON array written page by page, ending it with an error
+	object if a page fails once the response has started, as the Flask API does.
+
+	:param list[bytes] first_pages: Entities of the pages already fetched
+	:param collections.abc.AsyncIterator[bytes] pages: Raw content of the remaining pages, as returned by iter_pages()
+	:param OrionQuery query: Query whose pages they are
+	:param str path: Path of the user's request
+	:return: Chunks of the JSON array containing every entity
+	:rtype: collections.abc.AsyncIterator[bytes]
+	:raises APIProcessError:
+	"""
+	size = 1
+	yield b'['
+	separator = b''
+	try:
+		for entities in first_pages:
+			if entities:
+				yield separator + entities
+				size += len(separator) + len(entities)
+				separator = b','
+		async for page in pages:
+			entities = get_page_entities(page, query)
+			if entities:
+				yield separator + entities
+				size += len(separator) + len(entities)
+				separator = b','
+	except APIProcessError:
+		logging.error(msg.API_STREAM_ABORTED.format(path=path, size=size))
+		yield const.API_STREAM_ABORTED_BODY
+		raise
+	finally:
+		await pages.aclose()
+	yield b']'
+
+
+async def iter_pages(query, headers, method, offsets):
+	"""
+	Fetches concurrently the pages of a query starting at each of the offsets given.
+	No more pages than the workers set in API settings are requested ahead of the one being consumed and they are
+	yielded in the same order as the offsets. If any of them fails the pending ones are cancelled and the whole
+	request is aborted.
+
+	:param OrionQuery query: Query to make (its offset and limit parameters will be replaced for each page)
+	:param dict headers: Orion's required headers to make a proper API call
+	:param str method: HTTP method used in the requests
+	:param range offsets: Offsets of the pages to fetch (its step is the size of the pages and its stop the number of
+	entities)
+	:return: Raw content of every page sorted by offset
+	:rtype: collections.abc.AsyncIterator[bytes]
+	:raises APIProcessError:
+	"""
+	limit = offsets.step
+	count = offsets.stop
+	offsets = iter(offsets)
+	tasks = deque(asyncio.ensure_future(fetch_page(query, headers, method, offset, min(limit, count - offset)))
+				  for offset in itertools.islice(offsets, page_workers))
+	try:
+		while tasks:
+			content = await tasks.popleft()
+			for offset in itertools.islice(offsets, 1):
+				tasks.append(asyncio.ensure_future(fetch_page(query, headers, method, offset,
+															  min(limit, count - offset))))
+			yield content
+	except Exception as error:
+		logging.error(msg.API_PAGE_REQUEST_FAILED.format(url=query.get_url(), error=error))
+		raise APIProcessError
+	finally:
+		for task in tasks:
+			# Errors of pages already fetched are retrieved so they are not reported as never retrieved
+			if not task.cancel() and not task.cancelled():
+				task.exception()
+
+
+async def fetch_page(query, headers, method, offset, limit):
+	"""
+	Makes the query for a single page of a complete request, splitting it in smaller pages if it times out, as the
+	Flask API does.
+
+	:param OrionQuery query: Query to make (its offset and limit parameters will be replaced)
+	:param dict headers: Orion's required headers to make a proper API call
+	:param str method: HTTP method used in the request
+	:param int offset: Position of the first entity of the page
+	:param int limit: Number of entities of the page
+	:return: Raw content of the page
+	:rtype: bytes
+	:raises aiohttp.ClientError asyncio.TimeoutError:
+	"""
+	host = query.host
+	try:
+		response = await AsyncSessionManager.request(method, query.get_url(offset, limit), headers=headers)
+	except asyncio.TimeoutError:
+		smaller = page_sizes.reduce(host, limit, msg.API_PAGE_SIZE_REASON_TIMEOUT)
+		if smaller is None:
+			raise
+		return join_pages([await fetch_page(query, headers, method, part, min(smaller, offset + limit - part))
+						   for part in range(offset, offset + limit, smaller)], query)
+	response.raise_for_status()
+	content = await response.read()
+	page_sizes.accept(host, limit, len(content))
+	return content
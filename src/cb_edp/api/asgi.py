@@ -0,0 +1 @@
+from cb_edp.api.aio import app
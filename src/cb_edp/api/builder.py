@@ -1,3 +1,4 @@
+import threading
 from urllib.parse import urlparse
 from urllib.parse import quote
 
@@ -12,11 +13,14 @@ class APIBuilder:
 	"""
 	Utils class that includes different methods to build well-formatted solution's API URLs.
 	"""
+	__context = None
+	__context_lock = threading.Lock()
 
 	@staticmethod
 	def build_resource_url(fiware_service, fiware_service_path, **kwargs):
 		"""
 		Builds a REST API call based on the parameters passed and the specification of solution's API.
+		Hosts and FIWARE parameters are taken from the context of the current run, so they are resolved only once.
 
 		:param fiware_service: FIWARE Service which the Data Model belongs to
 		:param fiware_service_path: FIWARE Service Path where Data Model is located in its service
@@ -24,21 +28,37 @@ class APIBuilder:
 		:return: Integration API URL for querying context data
 		:rtype: str
 		"""
-		api_host = APIBuilder.get_host(const.INTEGRATION_API)
+		context = APIBuilder.get_context()
 
-		orion_host = APIBuilder.get_host(const.INTEGRATION_ORION)
-		orion_host = APIBuilder.encode_orion(orion_host)
+		url = context.base_url + '/entity/' + quote(kwargs.pop('entity'))
+		for name, value in kwargs.items():
+			url += '/' + name + '/' + quote(value)
 
-		url = '{api_host}/{orion_host}'.format(api_host=api_host, orion_host=orion_host)
+		return url + context.get_parameters(fiware_service, fiware_service_path)
 
-		url += '/{param}/{value}'.format(param='entity', value=quote(kwargs['entity']))
-		del kwargs['entity']
-		for name, value in kwargs.items():
-			url += '/{param}/{value}'.format(param=name, value=quote(value))
+	@classmethod
+	def get_context(cls):
+		"""
+		Returns the context used to build the URLs of the current run, creating it if it does not exist yet.
 
-		url += APIBuilder.build_parameters(fiware_service, fiware_service_path)
+		:return: URLs building context
+		:rtype: URLBuilderContext
+		:raises WrongFormatError:
+		"""
+		with cls.__context_lock:
+			if cls.__context is None:
+				cls.__context = URLBuilderContext()
+			return cls.__context
 
-		return url
+	@classmethod
+	def reset_context(cls):
+		"""
+		Discards the context used to build URLs, so hosts are read again from the config file by the next run.
+
+		:return: None
+		"""
+		with cls.__context_lock:
+			cls.__context = None
 
 	@staticmethod
 	def get_host(key):
@@ -101,3 +121,40 @@ class APIBuilder:
 				params += const.API_URL_STRUCTURE_FIWARE_SERVICEPATH.format(
 					value=Helpers.encode_base64_url(fiware_service_path))
 		return params
+
+
+class URLBuilderContext:
+	"""
+	Values needed to build solution's API URLs during a run: hosts are read from the config file, validated and encoded
+	once, and FIWARE parameters are built once for every service and service path.
+
+	:param str base_url: Solution's API host followed by Orion's encoded host
+	:param dict[(str, str), str] parameters: HTTP request parameters by FIWARE service and service path
+	"""
+
+	def __init__(self):
+		"""
+		Initializes URLBuilderContext.
+
+		:raises WrongFormatError:
+		"""
+		api_host = APIBuilder.get_host(const.INTEGRATION_API)
+		orion_host = APIBuilder.encode_orion(APIBuilder.get_host(const.INTEGRATION_ORION))
+		self.base_url = '{api_host}/{orion_host}'.format(api_host=api_host, orion_host=orion_host)
+		self.parameters = {}
+
+	def get_parameters(self, fiware_service, fiware_service_path):
+		"""
+		Returns the parameters to add to the API call for a FIWARE service and service path.
+
+		:param str fiware_service: FIWARE service
+		:param str fiware_service_path: FIWARE service path
+		:return: Portion with HTTP request parameters
+		:rtype: str
+		"""
+		key = (fiware_service, fiware_service_path)
+		parameters = self.parameters.get(key)
+		if parameters is None:
+			parameters = APIBuilder.build_parameters(fiware_service, fiware_service_path)
+			self.parameters[key] = parameters
+		return parameters
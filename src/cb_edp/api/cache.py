@@ -0,0 +1,205 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import cb_edp.config.constants as const
+import cb_edp.config.messages as msg
+from cb_edp.config.manager import ConfigManager
+
+
+class ResponseCache:
+	"""
+	In-memory LRU cache for the responses the API gets from Orion.
+	Its size is bounded by the bytes of the cached contents and every entry expires after a TTL that depends on how
+	often the data of its Data Model is updated (dataset.periodicity in the config file).
+
+	:param int capacity: Maximum number of bytes of content cached (0 disables the cache)
+	:param int default_ttl: Seconds an entry lives when its Data Model periodicity is unknown
+	:param int max_ttl: Maximum seconds an entry can live whatever its Data Model periodicity is
+	:param int hits: Number of requests answered from the cache
+	:param int misses: Number of requests that had to be sent to Orion
+	"""
+
+	def __init__(self, capacity, default_ttl, max_ttl):
+		"""
+		Initializes ResponseCache.
+
+		:param int capacity: Maximum number of bytes of content cached (0 disables the cache)
+		:param int default_ttl: Seconds an entry lives when its Data Model periodicity is unknown
+		:param int max_ttl: Maximum seconds an entry can live whatever its Data Model periodicity is
+		"""
+		self.capacity = capacity
+		self.default_ttl = default_ttl
+		self.max_ttl = max_ttl
+		self.size = 0
+		self.hits = 0
+		self.misses = 0
+		self._entries = OrderedDict()
+		self._ttls = None
+		self._lock = threading.Lock()
+
+	def get(self, key):
+		"""
+		Returns the cached response for a key if it exists and it has not expired yet.
+
+		:param tuple key: Key identifying the query made to Orion
+		:return: Cached content, status code and headers or None if there is no valid entry
+		:rtype: (bytes, int, list[(str, str)]) or None
+		"""
+		if not self.capacity:
+			return None
+
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is not None and entry[0] < time.monotonic():
+				self._discard(key)
+				entry = None
+			if entry is None:
+				self.misses += 1
+				return None
+			self._entries.move_to_end(key)
+			self.hits += 1
+			return entry[2]
+
+	def set(self, key, content, status_code, headers, ttl):
+		"""
+		Stores a response evicting the least recently used ones until it fits in the cache.
+
+		:param tuple key: Key identifying the query made to Orion
+		:param bytes or str content: Content of the response
+		:param int status_code: Status code of the response
+		:param list[(str, str)] headers: Headers of the response
+		:param int ttl: Seconds the entry will be valid
+		:return: None
+		"""
+		if type(content) is str:
+			content = content.encode('utf8')
+		size = len(content)
+		if not ttl or size > self.capacity:
+			return
+
+		with self._lock:
+			if key in self._entries:
+				self._discard(key)
+			while self.size + size > self.capacity:
+				self._discard(next(iter(self._entries)))
+			self._entries[key] = (time.monotonic() + ttl, size, (content, status_code, headers))
+			self.size += size
+
+	def tee(self, key, chunks, status_code, headers, ttl):
+		"""
+		Wraps a streamed content so it is stored in the cache once it has been completely sent.
+		Chunks stop being kept as soon as they exceed cache capacity, so the memory used stays bounded.
+
+		:param tuple key: Key identifying the query made to Orion
+		:param collections.abc.Generator[bytes] chunks: Streamed content
+		:param int status_code: Status code of the response
+		:param list[(str, str)] headers: Headers of the response
+		:param int ttl: Seconds the entry will be valid
+		:return: Same chunks received
+		:rtype: collections.abc.Iterator[bytes]
+		"""
+		kept = []
+		size = 0
+		try:
+			for chunk in chunks:
+				if kept is not None:
+					size += len(chunk)
+					if size <= self.capacity:
+						kept.append(chunk)
+					else:
+						kept = None
+				yield chunk
+		finally:
+			chunks.close()
+		if kept is not None:
+			self.set(key, b''.join(kept), status_code, headers, ttl)
+
+	async def tee_async(self, key, chunks, status_code, headers, ttl):
+		"""
+		Asynchronous version of tee() for contents streamed by the asyncio API.
+
+		:param tuple key: Key identifying the query made to Orion
+		:param collections.abc.AsyncIterator[bytes] chunks: Streamed content
+		:param int status_code: Status code of the response
+		:param list[(str, str)] headers: Headers of the response
+		:param int ttl: Seconds the entry will be valid
+		:return: Same chunks received
+		:rtype: collections.abc.AsyncIterator[bytes]
+		"""
+		kept = []
+		size = 0
+		try:
+			async for chunk in chunks:
+				if kept is not None:
+					size += len(chunk)
+					if size <= self.capacity:
+						kept.append(chunk)
+					else:
+						kept = None
+				yield chunk
+		finally:
+			await chunks.aclose()
+		if kept is not None:
+			self.set(key, b''.join(kept), status_code, headers, ttl)
+
+	def get_ttl(self, datamodel):
+		"""
+		Returns the seconds a response for a Data Model (entity type) is kept in the cache.
+
+		:param str datamodel: Entity type queried
+		:return: TTL for the Data Model
+		:rtype: int
+		"""
+		if self._ttls is None:
+			self._ttls = self._load_ttls()
+		return self._ttls.get(datamodel, self.default_ttl)
+
+	def get_stats(self):
+		"""
+		Returns the counters of the cache.
+
+		:return: Hits, misses, entries and bytes used
+		:rtype: dict
+		"""
+		with self._lock:
+			return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries), 'size': self.size,
+					'capacity': self.capacity}
+
+	def _discard(self, key):
+		"""
+		Removes an entry from the cache.
+
+		:param tuple key: Key of the entry to remove
+		:return: None
+		"""
+		self.size -= self._entries.pop(key)[1]
+
+	def _load_ttls(self):
+		"""
+		Reads the periodicity of every Data Model in the config file and translates it to the TTL of its entities.
+		TTLs are the half of the update period and never longer than the maximum TTL set. If an entity appears in
+		several Data Models the shortest TTL is kept.
+
+		:return: TTL by entity type
+		:rtype: dict[str, int]
+		"""
+		ttls = {}
+		try:
+			for section in ConfigManager.get_datamodels():
+				periodicity = ConfigManager.get_value(section, const.DATASET_PERIODICITY)
+				if periodicity not in const.API_CACHE_PERIOD_RELATION:
+					continue
+				ttl = min(const.API_CACHE_PERIOD_RELATION[periodicity] // 2, self.max_ttl)
+
+				datamodel_type = ConfigManager.get_value(section, const.DATAMODEL_TYPE)
+				if datamodel_type in const.DATAMODELS:
+					entities = const.DATAMODELS[datamodel_type]['models']
+				else:
+					entities = [datamodel_type]
+				for entity in entities:
+					ttls[entity] = min(ttl, ttls.get(entity, ttl))
+		except Exception as error:
+			logging.warning(msg.API_CACHE_TTLS_NOT_LOADED.format(error=error))
+		return ttls
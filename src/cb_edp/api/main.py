@@ -1,5 +1,17 @@
+import binascii
+import itertools
+import json
+import logging
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import quote
+
 import requests
 from flask import Flask
+from flask import jsonify
 from flask import render_template
 from flask import request
 from flask import Response
@@ -7,9 +19,16 @@ from werkzeug.routing import BaseConverter
 
 import cb_edp.config.constants as const
 import cb_edp.config.messages as msg
+from cb_edp.api.cache import ResponseCache
+from cb_edp.api.paging import PageSizes
+from cb_edp.api.query import OrionQuery
+from cb_edp.api.rdf import RDFFile
+from cb_edp.config.manager import ConfigManager
 from cb_edp.errors.api import APIProcessError
 from cb_edp.errors.api import CouldNotReadRDFError
 from cb_edp.utils.helpers import Helpers
+from cb_edp.utils.sessions import SessionManager
+from cb_edp.utils.validators import Validators
 
 
 class RegexConverter(BaseConverter):
@@ -18,18 +37,39 @@ class RegexConverter(BaseConverter):
 		self.regex = items[0]
 
 
+if not logging.getLogger().handlers:
+	logging.basicConfig(format=const.API_LOG_FORMAT,
+						level=ConfigManager.get_api_value(const.API_LOG_LEVEL, const.API_LOG_LEVEL_DEFAULT).upper())
+
 app = Flask(__name__)
 app.url_map.converters['regex'] = RegexConverter
 default_offset = 0
 default_limit = 1000
+page_workers = ConfigManager.get_api_value(const.API_PAGE_WORKERS, const.API_PAGE_WORKERS_DEFAULT)
+Validators.is_positive_number(const.API_PAGE_WORKERS, page_workers)
+streaming = ConfigManager.get_api_value(const.API_STREAMING, const.API_STREAMING_DEFAULT)
+max_entities = ConfigManager.get_api_value(const.API_MAX_ENTITIES, const.API_MAX_ENTITIES_DEFAULT)
+page_executor = None
+page_executor_lock = threading.Lock()
+rdf_file = RDFFile(Helpers.get_rdf_path(), Helpers.get_compressed_rdf_paths())
+response_cache = ResponseCache(
+	ConfigManager.get_api_value(const.API_CACHE_SIZE, const.API_CACHE_SIZE_DEFAULT) * 1024 * 1024,
+	ConfigManager.get_api_value(const.API_CACHE_TTL, const.API_CACHE_TTL_DEFAULT),
+	ConfigManager.get_api_value(const.API_CACHE_MAX_TTL, const.API_CACHE_MAX_TTL_DEFAULT))
+page_sizes = PageSizes(
+	ConfigManager.get_api_value(const.API_PAGE_SIZE, const.API_PAGE_SIZE_DEFAULT),
+	ConfigManager.get_api_value(const.API_PAGE_MIN_SIZE, const.API_PAGE_MIN_SIZE_DEFAULT),
+	int(ConfigManager.get_api_value(const.API_PAGE_MAX_CONTENT, const.API_PAGE_MAX_CONTENT_DEFAULT) * 1024 * 1024))
+orion_params_regexes = {name: re.compile(regex) for name, regex in const.API_FIWARE_PARAMS_REGEXES.items()}
 
 
 @app.route(const.API_URL_STRUCTURE.format(route='<orion>/entity/<datamodel>'))
 def by_entity(rel_path, orion, datamodel):
 	"""
 	Makes a query to Orion API filtering by entity type.
+	Orion parameters attrs, q, mq, georel, geometry, coords and orderBy given by the user are added to the query.
 
-	:param str rel_path: Relative path from a regex where the API is located (its value is never used)
+	:param str rel_path: Relative path from a regex where the API is located
 	:param str orion: Base64 encoded Orion host
 	:param str datamodel: Data Model (entity) by which the filter will be done
 	:return: Query response to Orion API call
@@ -38,16 +78,21 @@ def by_entity(rel_path, orion, datamodel):
 	headers = build_headers(request)
 
 	orion_host = Helpers.decode_base64_url(orion)
-	url = build_url(orion_host, datamodel, request)
-	return make_request(url, headers, complete=check_if_complete_request(request))
+	orion_params = build_orion_params(request.args)
+	query = build_query(orion_host, datamodel, request, orion_params)
+	key = build_cache_key(orion_host, datamodel, None, headers, request, orion_params)
+	next_url = partial(build_next_url, rel_path, orion_host, datamodel, None, headers, orion_params)
+	return make_cached_request(key, datamodel, query, headers, complete=check_if_complete_request(request),
+							   next_url=next_url, path=request.full_path)
 
 
 @app.route(const.API_URL_STRUCTURE.format(route='<orion>/entity/<datamodel>/location/<location>'))
 def by_location(rel_path, orion, datamodel, location):
 	"""
 	Makes a query to Orion API filtering by an entity type and a geographical area.
+	Orion parameters attrs, q, mq, georel, geometry, coords and orderBy given by the user are added to the query.
 
-	:param str rel_path: Relative path from a regex where the API is located (its value is never used)
+	:param str rel_path: Relative path from a regex where the API is located
 	:param str orion: Base64 encoded Orion host
 	:param str datamodel: Data Model (entity) by which the filter will be done
 	:param str location: Name of a geographical area (political location) to filter the query
@@ -57,15 +102,41 @@ def by_location(rel_path, orion, datamodel, location):
 	headers = build_headers(request)
 
 	orion_host = Helpers.decode_base64_url(orion)
-	url = build_url(orion_host, datamodel, request)
-	url += const.API_FIWARE_URL_STRUCTURE_LOCATION.format(location=location)
-	return make_request(url, headers, complete=check_if_complete_request(request))
+	orion_params = build_orion_params(request.args)
+	query = build_query(orion_host, datamodel, request, orion_params, location)
+	key = build_cache_key(orion_host, datamodel, location, headers, request, orion_params)
+	next_url = partial(build_next_url, rel_path, orion_host, datamodel, location, headers, orion_params)
+	return make_cached_request(key, datamodel, query, headers, complete=check_if_complete_request(request),
+							   next_url=next_url, path=request.full_path)
+
+
+@app.route(const.API_URL_STRUCTURE.format(route=const.API_URL_NEXT))
+def next_entities(rel_path, token):
+	"""
+	Makes the query of a complete request that had more entities than the maximum set in API settings, returning the
+	entities after the ones already returned. The query is the one encoded in the token of the previous response's
+	Link header.
+
+	:param str rel_path: Relative path from a regex where the API is located
+	:param str token: Continuation token given by the previous response
+	:return: Query response to Orion API call
+	:rtype: (str, int, ItemsView)
+	:raises APIProcessError:
+	"""
+	orion_host, datamodel, location, headers, orion_params, offset = read_next_token(token)
+	query = build_query(orion_host, datamodel, request, orion_params, location, offset)
+	key = build_cache_key(orion_host, datamodel, location, headers, request, orion_params, offset)
+	next_url = partial(build_next_url, rel_path, orion_host, datamodel, location, headers, orion_params)
+	return make_cached_request(key, datamodel, query, headers, next_url=next_url, path=request.full_path)
 
 
 @app.route(const.API_URL_STRUCTURE.format(route=const.RDF_FILE_NAME))
 def rdf(rel_path):
 	"""
-	Reads the RDF file generated by the integration and returns it in request's response.
+	Returns in request's response the RDF file generated by the integration.
+	The file is kept in memory while it does not change on disk and the response includes its ETag and Last-Modified
+	headers, so conditional requests (If-None-Match or If-Modified-Since) get a 304 when the catalogue did not change.
+	If the client accepts it, a compressed version of the file written by the integration is sent instead.
 
 	:param str rel_path: Relative path from a regex where the API is located (its value is never used)
 	:return: Generated RDF/XML file
@@ -73,14 +144,16 @@ def rdf(rel_path):
 	:raises CouldNotReadRDFError APIProcessError:
 	"""
 	try:
-		with open(Helpers.get_rdf_path(), 'r') as file:
-			rdf_xml = file.read()
-		response = Response()
-		response.mimetype = 'application/rdf+xml'
-		response.data = rdf_xml
-		return response
-	except FileNotFoundError:
-		raise CouldNotReadRDFError
+		rdf_xml, encoding, etag, last_modified = rdf_file.get(request.accept_encodings)
+		response = Response(rdf_xml, mimetype='application/rdf+xml')
+		if encoding:
+			response.content_encoding = encoding
+		response.vary.add('Accept-Encoding')
+		response.set_etag(etag)
+		response.last_modified = last_modified
+		return response.make_conditional(request)
+	except CouldNotReadRDFError:
+		raise
 	except:
 		raise APIProcessError
 
@@ -97,6 +170,18 @@ def status(rel_path):
 	return Response(msg.API_STATUS_OK)
 
 
+@app.route(const.API_URL_STRUCTURE.format(route=const.API_URL_CACHE_STATUS))
+def cache_status(rel_path):
+	"""
+	Returns the counters of the cache of Orion responses kept by current API process.
+
+	:param str rel_path: Relative path from a regex where the API is located (its value is never used)
+	:return: JSON with cache hits, misses, entries and size
+	:rtype: Response
+	"""
+	return jsonify(response_cache.get_stats())
+
+
 @app.errorhandler(CouldNotReadRDFError)
 @app.errorhandler(APIProcessError)
 def handle_custom_api_errors(exception):
@@ -107,30 +192,78 @@ def handle_custom_api_errors(exception):
 	:return: Error page template with a brief error description
 	"""
 	return render_template('error.html', error_code=exception.status_code, title=exception.short_message,
-						   message=exception.message)
+						   message=exception.message), exception.status_code
 
 
-def build_url(host, entity, request):
+def build_query(host, entity, request, orion_params, location=None, offset=None):
 	"""
-	Generates the URL to make the call to Orion API filtering by an entity type.
+	Generates the query to make the call to Orion API filtering by an entity type and, optionally, a geographical area.
+	Orion parameters given by the user are added to the query (their q filter is added to the location filters).
 
 	:param str host: Host address where Orion is reachable
 	:param str entity: Entity name by which the filter will be done
 	:param Request request: Request object representing the one made by the user
-	:return: Well-formed URL to Orion API
-	:rtype: str
+	:param dict orion_params: Orion parameters given by the user, as returned by build_orion_params()
+	:param str location: Name of a geographical area (political location) to filter the query (default 'None')
+	:param int offset: Position of the first entity asked for instead of the one requested by the user (default 'None')
+	:return: Query to Orion API
+	:rtype: OrionQuery
 	"""
 	if host[-1] is '/':
 		host = host[:-1]
 
-	offset = request.args.get('offset')
+	if offset is None:
+		offset = request.args.get('offset')
 	limit = request.args.get('limit')
 	if not offset:
 		offset = default_offset
 	if not limit:
 		limit = default_limit
 
-	return const.API_FIWARE_URL_STRUCTURE.format(host=host, entity=entity, offset=offset, limit=limit)
+	params = {'type': entity, 'options': const.API_FIWARE_URL_OPTIONS, 'offset': offset, 'limit': limit}
+	location_filters = [location_filter.format(location=location)
+						for location_filter in const.API_FIWARE_URL_LOCATION_FILTERS] if location else []
+	for name, value in orion_params.items():
+		value = quote(value, safe=const.API_FIWARE_PARAMS_SAFE_CHARS)
+		if name == 'q' and location_filters:
+			location_filters = ['{location_filter};{q}'.format(location_filter=location_filter, q=value)
+								for location_filter in location_filters]
+		else:
+			params[name] = value
+	if location_filters:
+		params['q'] = location_filters
+	return OrionQuery(const.API_FIWARE_URL_STRUCTURE.format(host=host), params)
+
+
+def build_orion_params(args):
+	"""
+	Picks the Orion parameters that users can pass through to their queries (attributes returned, simple and metadata
+	queries, geographical queries and ordering) checking their format. Geographical queries need georel, geometry and
+	coords parameters together.
+
+	:param dict args: Parameters given by the user
+	:return: Orion parameters given, in the order they are sent to Orion
+	:rtype: dict
+	:raises APIProcessError:
+	"""
+	orion_params = {}
+	for name, regex in orion_params_regexes.items():
+		value = args.get(name)
+		if not value:
+			continue
+		if not isinstance(value, str) or len(value) > const.API_FIWARE_PARAMS_MAX_LENGTH or not regex.fullmatch(value):
+			logging.warning(msg.API_ORION_PARAM_NOT_VALID.format(name=name, value=value))
+			raise APIProcessError(message=msg.API_ORION_PARAM_NOT_VALID_ERROR.format(name=name),
+								  short_message=msg.API_QUERY_NOT_VALID_SHORT_ERROR, status_code=400)
+		orion_params[name] = value
+
+	geo_params = [name for name in const.API_FIWARE_PARAMS_GEO if name in orion_params]
+	if geo_params and len(geo_params) < len(const.API_FIWARE_PARAMS_GEO):
+		params = ', '.join(const.API_FIWARE_PARAMS_GEO)
+		logging.warning(msg.API_ORION_GEO_PARAMS_INCOMPLETE.format(params=params))
+		raise APIProcessError(message=msg.API_ORION_GEO_PARAMS_INCOMPLETE_ERROR.format(params=params),
+							  short_message=msg.API_QUERY_NOT_VALID_SHORT_ERROR, status_code=400)
+	return orion_params
 
 
 def build_headers(request):
@@ -156,41 +289,348 @@ def build_headers(request):
 	return headers
 
 
-def make_request(url, headers, method='get', complete=True):
+def build_cache_key(host, entity, location, headers, request, orion_params, start=None):
+	"""
+	Generates the key that identifies a query to Orion in the responses cache.
+
+	:param str host: Host address where Orion is reachable
+	:param str entity: Entity name by which the filter is done
+	:param str or None location: Name of the geographical area by which the filter is done
+	:param dict headers: Orion's headers built for the query
+	:param Request request: Request object representing the one made by the user
+	:param dict orion_params: Orion parameters given by the user
+	:param int start: Position of the first entity of a continued complete request (default 'None')
+	:return: Key of the query
+	:rtype: tuple
+	"""
+	return (host.rstrip('/'), entity, location, headers.get(const.API_FIWARE_SERVICE),
+			headers.get(const.API_FIWARE_SERVICEPATH), request.args.get('offset'), request.args.get('limit'),
+			tuple(orion_params.items()), start)
+
+
+def build_next_url(rel_path, host, entity, location, headers, orion_params, offset):
+	"""
+	Generates the URL that continues a complete request from a given entity. The query is encoded in an opaque token
+	holding the Orion host, the FIWARE service and service path, the entity type, the location, the Orion parameters
+	given by the user and the offset.
+
+	:param str rel_path: Relative path from a regex where the API is located
+	:param str host: Host address where Orion is reachable
+	:param str entity: Entity name by which the filter is done
+	:param str or None location: Name of the geographical area by which the filter is done
+	:param dict headers: Orion's headers built for the query
+	:param dict orion_params: Orion parameters given by the user
+	:param int offset: Position of the first entity to return
+	:return: Absolute path of the URL in the API
+	:rtype: str
+	"""
+	token = json.dumps([host, entity, location, headers.get(const.API_FIWARE_SERVICE),
+						headers.get(const.API_FIWARE_SERVICEPATH), orion_params, offset], separators=(',', ':'))
+	return const.API_URL_NEXT_STRUCTURE.format(rel_path=rel_path, token=Helpers.encode_base64_url(token))
+
+
+def read_next_token(token):
+	"""
+	Decodes the query of a continuation token generated by build_next_url().
+
+	:param str token: Continuation token
+	:return: Orion host, entity name, location, Orion's headers, Orion parameters given by the user and offset of the
+	query
+	:rtype: (str, str, str or None, dict, dict, int)
+	:raises APIProcessError:
+	"""
+	try:
+		host, entity, location, service, service_path, orion_params, offset = json.loads(
+			Helpers.decode_base64_url(token))
+		if not isinstance(orion_params, dict):
+			raise ValueError(token)
+		if not all(isinstance(value, str) for value in (host, entity)) or type(offset) is not int or offset < 0:
+			raise ValueError(token)
+		if not all(value is None or isinstance(value, str) for value in (location, service, service_path)):
+			raise ValueError(token)
+	except (ValueError, TypeError, binascii.Error) as error:
+		logging.warning(msg.API_NEXT_TOKEN_NOT_VALID.format(token=token, error=error))
+		raise APIProcessError(message=msg.API_NEXT_TOKEN_NOT_VALID_ERROR,
+							  short_message=msg.API_QUERY_NOT_VALID_SHORT_ERROR, status_code=400)
+
+	headers = {'Accept': 'application/json'}
+	if service:
+		headers[const.API_FIWARE_SERVICE] = service
+		if service_path:
+			headers[const.API_FIWARE_SERVICEPATH] = service_path
+	return host, entity, location, headers, build_orion_params(orion_params), offset
+
+
+def make_cached_request(key, entity, query, headers, complete=True, next_url=None, path=None):
+	"""
+	Returns the response for a query from the cache or, if it is not there, makes it and caches its response.
+	Only successful responses are cached and their TTL depends on the periodicity of the entity's Data Model.
+
+	:param tuple key: Key of the query in the responses cache
+	:param str entity: Entity name by which the filter is done
+	:param OrionQuery query: Query to make
+	:param dict headers: Orion's required headers to make a proper API call
+	:param bool complete: Flag that indicates if the request should return every entity by the filter (default 'True')
+	:param next_url: Function returning the URL that continues the request from a given offset (default 'None')
+	:param str path: Path of the user's request, identifying it in the logs of streamed responses (default 'None')
+	:return: Query response to Orion API call
+	:rtype: (bytes or str or Response, int, list[(str, str)])
+	"""
+	cached = response_cache.get(key)
+	if cached is not None:
+		content, status_code, response_headers = cached
+		return content, status_code, response_headers + [(const.API_CACHE_HEADER, 'HIT')]
+
+	content, status_code, response_headers = make_request(query, headers, complete=complete, next_url=next_url,
+														  path=path)
+	response_headers = list(response_headers)
+	if status_code == 200:
+		ttl = response_cache.get_ttl(entity)
+		if isinstance(content, Response):
+			content.response = response_cache.tee(key, content.response, status_code, response_headers, ttl)
+		else:
+			response_cache.set(key, content, status_code, response_headers, ttl)
+	return content, status_code, response_headers + [(const.API_CACHE_HEADER, 'MISS')]
+
+
+def make_request(query, headers, method='get', complete=True, next_url=None, path=None):
 	"""
 	Makes a query and returns its response.
+	Complete requests return at most the maximum number of entities set in API settings. When the query has more
+	entities, the response includes a Link header (rel="next") with the URL that returns the next ones.
 
-	:param str url: URL where the call is made
+	:param OrionQuery query: Query to make
 	:param dict headers: Orion's required headers to make a proper API call
 	:param str method: HTTP method used in the request (default 'get')
 	:param bool complete: Flag that indicates if the request should return every entity by the filter (default 'True')
-	:return: Query response to Orion API call
-	:rtype: (str, int, collections.abc.ItemsView)
+	:param next_url: Function returning the URL that continues the request from a given offset (default 'None')
+	:param str path: Path of the user's request, identifying it in the logs of streamed responses (default 'None')
+	:return: Query response to Orion API call (streamed when it is complete and streaming is enabled in API settings)
+	:rtype: (str or Response, int, collections.abc.ItemsView)
 	"""
-	response = requests.request(method, url, headers=headers)
+	if complete:
+		response, limit = request_first_page(query, headers, method)
+	else:
+		response = SessionManager.request(method, query.get_url(), headers=headers)
 	content = response.content
+	response_headers = response.headers
 	if complete and const.API_FIWARE_TOTAL_COUNT_HEADER in response.headers:
-		limit = default_limit
-		offset = default_offset + default_limit
-
+		start = int(query.params['offset'])
 		count = int(response.headers[const.API_FIWARE_TOTAL_COUNT_HEADER])
-		if count > limit:
-			import json, re
-			content = json.loads(content)
-			url = re.sub(r'(limit=)\d+', '\g<1>{number}'.format(number=limit), url)
-			while offset < count:
-				url = re.sub(r'(offset=)\d+', '\g<1>{number}'.format(number=offset), url)
-				response = requests.request(method, url, headers=headers)
-				content += json.loads(response.content)
-				offset += limit
-			content = json.dumps(content)
+		stop = min(count, start + max_entities) if max_entities else count
+		if stop < count and next_url:
+			logging.info(msg.API_ENTITIES_CAPPED.format(url=query.get_url(), offset=start, stop=stop, count=count))
+			response_headers['Link'] = const.API_LINK_NEXT.format(url=next_url(stop))
+		if stop > start + limit:
+			offsets = range(start + limit, stop, limit)
+			response_headers.pop('Content-Length', None)
+			if streaming:
+				pages = iter_pages(query, headers, method, offsets)
+				try:
+					first_pages = [get_page_entities(content, query), get_page_entities(next(pages), query)]
+				except BaseException:
+					pages.close()
+					raise
+				content = Response(stream_pages(first_pages, pages, query, path), mimetype='application/json')
+			else:
+				content = json.loads(content)
+				for page in iter_pages(query, headers, method, offsets):
+					content += json.loads(page)
+				content = json.dumps(content)
 
 	# Headers removal when gzip content returned to avoid encoding misunderstandings
 	for header in const.API_FIWARE_RESPONSE_IGNORE_HEADERS:
-		if header in response.headers:
-			response.headers.pop(header)
+		if header in response_headers:
+			response_headers.pop(header)
+
+	return content, response.status_code, response_headers.items()
+
+
+def request_first_page(query, headers, method):
+	"""
+	Makes the query for the first page of a complete request asking for as many entities as the page size of its
+	Orion host (but no more than the maximum number of entities returned). While the host is not probed yet, smaller
+	pages are tried if Orion rejects the size of the page (any other rejection is returned as it is). If the page times
+	out, the page size of the host is reduced and the page is requested again.
+
+	:param OrionQuery query: Query to make (its limit parameter will be replaced by the page size)
+	:param dict headers: Orion's required headers to make a proper API call
+	:param str method: HTTP method used in the request
+	:return: Query response to Orion API call and number of entities asked for
+	:rtype: (requests.Response, int)
+	:raises requests.RequestException:
+	"""
+	host = query.host
+	limit = min(page_sizes.get(host), max_entities) if max_entities else page_sizes.get(host)
+	while True:
+		try:
+			response = SessionManager.request(method, query.get_url(limit=limit), headers=headers)
+		except requests.RequestException as error:
+			smaller = page_sizes.reduce(host, limit, msg.API_PAGE_SIZE_REASON_TIMEOUT) if SessionManager.is_timeout(
+				error) else None
+			if smaller is None:
+				raise
+			limit = smaller
+			continue
+
+		if response.status_code == 200:
+			page_sizes.accept(host, limit, len(response.content))
+		elif response.status_code == 400 and not page_sizes.is_probed(host) and page_sizes.is_size_rejected(
+				limit, response.content):
+			smaller = page_sizes.get_smaller(limit)
+			if smaller is not None:
+				logging.info(msg.API_PAGE_SIZE_REJECTED.format(host=host, size=limit, reason=response.status_code,
+															   new_size=smaller))
+				limit = smaller
+				continue
+		return response, limit
+
+
+def stream_pages(first_pages, pages, query, path):
+	"""
+	Generates the body of a complete request as a single JSON array written page by page.
+	Instead of parsing each page, the entities inside its brackets are copied to the output as they arrive, so only
+	the pages being fetched are held in memory. The first pages are fetched before the response starts, so Orion
+	errors in them get an error response. Once the response has started its status cannot change: if a page fails,
+	the abort is logged, the body is ended with an error object that leaves the JSON array unfinished (so it is not
+	valid JSON) and the error is raised again, so the server closes the connection and the response is not cached.
+
+	:param list[bytes] first_pages: Entities of the pages already fetched
+	:param collections.abc.Iterator[bytes] pages: Raw content of the remaining pages, as returned by iter_pages()
+	:param OrionQuery query: Query whose pages they are
+	:param str path: Path of the user's request
+	:return: Chunks of the JSON array containing every entity
+	:rtype: collections.abc.Iterator[bytes]
+	:raises APIProcessError:
+	"""
+	size = 1
+	yield b'['
+	separator = b''
+	try:
+		for entities in itertools.chain(first_pages, (get_page_entities(page, query) for page in pages)):
+			if entities:
+				yield separator + entities
+				size += len(separator) + len(entities)
+				separator = b','
+	except APIProcessError:
+		logging.error(msg.API_STREAM_ABORTED.format(path=path, size=size))
+		yield const.API_STREAM_ABORTED_BODY
+		raise
+	finally:
+		pages.close()
+	yield b']'
+
+
+def get_page_entities(page, query):
+	"""
+	Extracts the entities of a page without parsing them, so they can be copied into the JSON array of a complete
+	request.
+
+	:param bytes page: Raw content of a page
+	:param OrionQuery query: Query whose page it is
+	:return: Entities inside the brackets of the page (empty if the page has no entities)
+	:rtype: bytes
+	:raises APIProcessError:
+	"""
+	page = page.strip()
+	if page[:1] != b'[' or page[-1:] != b']':
+		logging.error(msg.API_PAGE_NOT_ARRAY.format(url=query.get_url()))
+		raise APIProcessError
+	return page[1:-1].strip()
 
-	return content, response.status_code, response.headers.items()
+
+def iter_pages(query, headers, method, offsets):
+	"""
+	Fetches concurrently the pages of a query starting at each of the offsets given.
+	Pages are requested through a worker pool bounded by the API settings and yielded in the same order as the
+	offsets. No more pages than workers are requested ahead of the one being consumed. If any of them fails the pending
+	ones are cancelled and the whole request is aborted.
+
+	:param OrionQuery query: Query to make (its offset and limit parameters will be replaced for each page)
+	:param dict headers: Orion's required headers to make a proper API call
+	:param str method: HTTP method used in the requests
+	:param range offsets: Offsets of the pages to fetch (its step is the size of the pages and its stop the number of
+	entities)
+	:return: Raw content of every page sorted by offset
+	:rtype: collections.abc.Iterator[bytes]
+	:raises APIProcessError:
+	"""
+	executor = get_page_executor()
+	limit = offsets.step
+	count = offsets.stop
+	offsets = iter(offsets)
+	futures = deque(executor.submit(fetch_page, query, headers, method, offset, min(limit, count - offset))
+					for offset in itertools.islice(offsets, page_workers))
+	try:
+		while futures:
+			content = futures.popleft().result()
+			for offset in itertools.islice(offsets, 1):
+				futures.append(executor.submit(fetch_page, query, headers, method, offset, min(limit, count - offset)))
+			yield content
+	except Exception as error:
+		logging.error(msg.API_PAGE_REQUEST_FAILED.format(url=query.get_url(), error=error))
+		raise APIProcessError
+	finally:
+		for future in futures:
+			future.cancel()
+
+
+def fetch_page(query, headers, method, offset, limit):
+	"""
+	Makes the query for a single page of a complete request.
+	If the page times out, the page size of its Orion host is reduced and the page is fetched again split in pages of
+	the new size.
+
+	:param OrionQuery query: Query to make (its offset and limit parameters will be replaced)
+	:param dict headers: Orion's required headers to make a proper API call
+	:param str method: HTTP method used in the request
+	:param int offset: Position of the first entity of the page
+	:param int limit: Number of entities of the page
+	:return: Raw content of the page
+	:rtype: bytes
+	:raises requests.RequestException:
+	"""
+	host = query.host
+	try:
+		response = SessionManager.request(method, query.get_url(offset, limit), headers=headers)
+	except requests.RequestException as error:
+		smaller = page_sizes.reduce(host, limit, msg.API_PAGE_SIZE_REASON_TIMEOUT) if SessionManager.is_timeout(
+			error) else None
+		if smaller is None:
+			raise
+		return join_pages([fetch_page(query, headers, method, part, min(smaller, offset + limit - part))
+						   for part in range(offset, offset + limit, smaller)], query)
+	response.raise_for_status()
+	page_sizes.accept(host, limit, len(response.content))
+	return response.content
+
+
+def join_pages(pages, query):
+	"""
+	Joins the entities of several consecutive pages in a single page.
+
+	:param list[bytes] pages: Raw content of the pages
+	:param OrionQuery query: Query whose pages they are
+	:return: Raw content of the joined page
+	:rtype: bytes
+	:raises APIProcessError:
+	"""
+	entities = (get_page_entities(page, query) for page in pages)
+	return b'[' + b','.join(page_entities for page_entities in entities if page_entities) + b']'
+
+
+def get_page_executor():
+	"""
+	Returns the worker pool used to fetch pages, creating it the first time it is needed (after Gunicorn forks).
+
+	:return: Pool of threads shared by every request of the process
+	:rtype: ThreadPoolExecutor
+	"""
+	global page_executor
+	with page_executor_lock:
+		if page_executor is None:
+			page_executor = ThreadPoolExecutor(max_workers=page_workers)
+	return page_executor
 
 
 def check_if_complete_request(request):
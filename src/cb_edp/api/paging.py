@@ -0,0 +1,128 @@
+import json
+import logging
+import threading
+
+import cb_edp.config.constants as const
+import cb_edp.config.messages as msg
+
+
+class PageSizes:
+	"""
+	Number of entities asked for in each page of the complete downloads made to every Orion host.
+	Hosts start with the largest page size set. The first download made to a host probes it: while Orion rejects the
+	size (or the page times out) smaller ones are tried, and the first size accepted is kept for the next downloads. A
+	page is only retried smaller when Orion's rejection can be due to its size (see is_size_rejected).
+	Afterwards the size of a host is halved every time one of its pages times out or weighs more than allowed, but it
+	is never reduced below the minimum size set.
+
+	:param int max_size: Largest number of entities asked for in a page
+	:param int min_size: Smallest number of entities asked for in a page
+	:param int max_content: Maximum bytes a page can weigh before the page size of its host is reduced
+	"""
+
+	def __init__(self, max_size, min_size, max_content):
+		"""
+		Initializes PageSizes.
+
+		:param int max_size: Largest number of entities asked for in a page
+		:param int min_size: Smallest number of entities asked for in a page
+		:param int max_content: Maximum bytes a page can weigh before the page size of its host is reduced
+		"""
+		self.max_size = max_size
+		self.min_size = min(min_size, max_size)
+		self.max_content = max_content
+		self._sizes = {}
+		self._probed = set()
+		self._lock = threading.Lock()
+
+	def get(self, host):
+		"""
+		Returns the page size used with a host.
+
+		:param str host: Orion host (scheme and network location)
+		:return: Number of entities asked for in each page
+		:rtype: int
+		"""
+		return self._sizes.get(host, self.max_size)
+
+	def is_probed(self, host):
+		"""
+		Checks if a host already accepted a page size.
+
+		:param str host: Orion host (scheme and network location)
+		:return: If the page size of the host is known
+		:rtype: bool
+		"""
+		return host in self._probed
+
+	def get_smaller(self, size):
+		"""
+		Returns the page size tried after a given one (its half, but never less than the minimum size).
+
+		:param int size: Page size that failed
+		:return: Next page size or None if the size given is already the minimum one
+		:rtype: int or None
+		"""
+		if size <= self.min_size:
+			return None
+		return max(size // 2, self.min_size)
+
+	@staticmethod
+	def is_size_rejected(size, content):
+		"""
+		Checks if a page rejected by Orion (400 Bad Request) may be accepted asking for fewer entities: only if more
+		entities than Orion returns in a page were asked for or if Orion's error description is about the limit.
+		Any other rejection (e.g. a wrong filter) would be rejected again whatever the page size.
+
+		:param int size: Number of entities asked for in the page
+		:param bytes content: Body of Orion's response
+		:return: If the page size is the reason of the rejection
+		:rtype: bool
+		"""
+		if size > const.API_FIWARE_MAX_LIMIT:
+			return True
+		try:
+			error = json.loads(content)
+		except ValueError:
+			return False
+		return isinstance(error, dict) and const.API_FIWARE_LIMIT_ERROR in str(error.get('description', '')).lower()
+
+	def accept(self, host, size, content_length):
+		"""
+		Registers a page successfully returned by a host. If the host was not probed yet, the size of the page becomes
+		the page size of the host. If the page weighs too much, the page size is reduced.
+
+		:param str host: Orion host (scheme and network location)
+		:param int size: Number of entities asked for in the page
+		:param int content_length: Bytes of the page
+		:return: None
+		"""
+		with self._lock:
+			if host not in self._probed:
+				self._probed.add(host)
+				self._sizes[host] = size
+				logging.info(msg.API_PAGE_SIZE_PROBED.format(host=host, size=size))
+		if content_length > self.max_content:
+			self.reduce(host, size, msg.API_PAGE_SIZE_REASON_TOO_LARGE.format(
+				size=content_length / 1024 / 1024, max=self.max_content / 1024 / 1024))
+
+	def reduce(self, host, size, reason):
+		"""
+		Reduces the page size of a host after one of its pages failed or weighed too much.
+
+		:param str host: Orion host (scheme and network location)
+		:param int size: Number of entities asked for in the page
+		:param str reason: Why the page size is reduced
+		:return: New page size or None if the size of the page is already the minimum one
+		:rtype: int or None
+		"""
+		smaller = self.get_smaller(size)
+		if smaller is None:
+			return None
+		with self._lock:
+			current = self._sizes.get(host, self.max_size)
+			if smaller < current:
+				self._sizes[host] = smaller
+				logging.warning(msg.API_PAGE_SIZE_REDUCED.format(host=host, size=current, new_size=smaller,
+																  reason=reason))
+		return smaller
@@ -0,0 +1,61 @@
+from urllib.parse import urlparse
+
+
+class OrionQuery:
+	"""
+	Query made to Orion entities API kept as its base URL and its parameters, so the URL of every page of a complete
+	request is built filling in its offset and limit instead of rewriting the URL of another page. Parameters are
+	written once when the query is created, so building the URL of a page only writes its offset and limit.
+	Parameters are sent in the order they were given and their values as they are (lists and tuples are sent as the
+	same parameter repeated once per value).
+
+	:param str base_url: URL of Orion entities API (without query string)
+	:param dict params: Parameters of the query
+	"""
+
+	__slots__ = ('base_url', 'params', 'host', '_query')
+
+	def __init__(self, base_url, params):
+		"""
+		Initializes OrionQuery.
+
+		:param str base_url: URL of Orion entities API (without query string)
+		:param dict params: Parameters of the query
+		"""
+		url_parsed = urlparse(base_url)
+		self.base_url = base_url
+		self.params = params
+		self.host = '{scheme}://{netloc}'.format(scheme=url_parsed.scheme, netloc=url_parsed.netloc)
+		self._query = {name: OrionQuery.build_param(name, value) for name, value in params.items()}
+
+	def get_url(self, offset=None, limit=None):
+		"""
+		Builds the URL of the query, replacing its offset and limit parameters when they are given.
+
+		:param int offset: Position of the first entity asked for
+		:param int limit: Number of entities asked for
+		:return: Well-formed URL to Orion API
+		:rtype: str
+		"""
+		query = self._query
+		if offset is not None or limit is not None:
+			query = query.copy()
+			if offset is not None:
+				query['offset'] = OrionQuery.build_param('offset', offset)
+			if limit is not None:
+				query['limit'] = OrionQuery.build_param('limit', limit)
+		return '{url}?{query}'.format(url=self.base_url, query='&'.join(query.values()))
+
+	@staticmethod
+	def build_param(name, value):
+		"""
+		Writes a parameter as it goes in the query string of a URL.
+
+		:param str name: Name of the parameter
+		:param value: Value of the parameter (lists and tuples are written as the parameter repeated)
+		:return: Parameter written as name=value pairs
+		:rtype: str
+		"""
+		if isinstance(value, (list, tuple)):
+			return '&'.join('{name}={value}'.format(name=name, value=item) for item in value)
+		return '{name}={value}'.format(name=name, value=value)
@@ -0,0 +1,174 @@
+import gzip
+import hashlib
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+from datetime import timezone
+
+import cb_edp.config.constants as const
+import cb_edp.config.messages as msg
+from cb_edp.errors.api import CouldNotReadRDFError
+
+try:
+	import brotli
+except ImportError:
+	brotli = None
+
+
+class RDFFile:
+	"""
+	In-memory copy of the RDF/XML file generated by the integration, as it is served by the API.
+	The file is only read again from disk when its modification time, inode or size change, and the validators used
+	in conditional requests (ETag and Last-Modified) are computed once per version of the file. Compressed versions
+	written by the integration next to the file are loaded too, once checked they match its current content.
+
+	:param str path: Location of the RDF/XML file
+	:param dict[str, str] compressed_paths: Location of each compressed version of the file by content encoding
+	:param dict[str, (bytes, str)] variants: Content and strong entity tag of the file by content encoding
+	:param datetime last_modified: Date when the catalogue was last modified
+	"""
+
+	def __init__(self, path, compressed_paths):
+		"""
+		Initializes RDFFile.
+
+		:param str path: Location of the RDF/XML file
+		:param dict[str, str] compressed_paths: Location of each compressed version of the file by content encoding
+		"""
+		self.path = path
+		self.compressed_paths = compressed_paths
+		self.variants = {}
+		self.last_modified = None
+		self._signature = None
+		self._lock = threading.Lock()
+
+	def get(self, accept_encodings):
+		"""
+		Returns the current version of the file in the encoding preferred by the client, reloading the file if it
+		changed on disk since the last call.
+
+		:param werkzeug.datastructures.Accept accept_encodings: Content encodings accepted by the client
+		:return: Content, content encoding (None if not compressed), entity tag and last modification date
+		:rtype: (bytes, str or None, str, datetime)
+		:raises CouldNotReadRDFError:
+		"""
+		signature = self._get_signature()
+		with self._lock:
+			if signature != self._signature:
+				self._load(signature)
+			encoding = self._choose_encoding(accept_encodings)
+			content, etag = self.variants[encoding]
+			return content, encoding if encoding != const.API_RDF_IDENTITY_ENCODING else None, etag, self.last_modified
+
+	def _get_signature(self):
+		"""
+		Obtains the modification time, inode and size of the file and its compressed versions.
+
+		:return: Tuple identifying the version of every file (None for compressed files not present)
+		:rtype: tuple
+		:raises CouldNotReadRDFError:
+		"""
+		try:
+			stat = os.stat(self.path)
+		except FileNotFoundError:
+			raise CouldNotReadRDFError
+		signature = [(stat.st_mtime_ns, stat.st_ino, stat.st_size)]
+		for path in self.compressed_paths.values():
+			try:
+				stat = os.stat(path)
+				signature.append((stat.st_mtime_ns, stat.st_ino, stat.st_size))
+			except FileNotFoundError:
+				signature.append(None)
+		return tuple(signature)
+
+	def _load(self, signature):
+		"""
+		Reads the file and its compressed versions from disk and computes their validators.
+		Compressed versions that cannot be decompressed (e.g. Brotli ones when brotli module is not installed) or whose
+		content does not match the file are ignored.
+
+		:param tuple signature: Version of the files read
+		:return: None
+		:raises CouldNotReadRDFError:
+		"""
+		logging.debug(msg.API_RDF_RELOAD.format(path=self.path))
+		try:
+			with open(self.path, 'rb') as file:
+				content = file.read()
+		except FileNotFoundError:
+			raise CouldNotReadRDFError
+		etag = hashlib.sha256(content).hexdigest()
+		self.variants = {const.API_RDF_IDENTITY_ENCODING: (content, etag)}
+
+		for encoding, path in self.compressed_paths.items():
+			try:
+				with open(path, 'rb') as file:
+					compressed_content = file.read()
+				if RDFFile._decompress(encoding, compressed_content) == content:
+					self.variants[encoding] = (compressed_content, '{etag}-{encoding}'.format(etag=etag,
+																							  encoding=encoding))
+				else:
+					logging.warning(msg.API_RDF_COMPRESSED_OUTDATED.format(path=path))
+			except Exception:
+				continue
+
+		self.last_modified = RDFFile._get_catalogue_date(content) or datetime.fromtimestamp(
+			signature[0][0] // 1000000000, timezone.utc)
+		self._signature = signature
+
+	def _choose_encoding(self, accept_encodings):
+		"""
+		Chooses among the loaded versions of the file the one with the encoding most preferred by the client.
+		Ties are resolved in favour of the smallest version.
+
+		:param werkzeug.datastructures.Accept accept_encodings: Content encodings accepted by the client
+		:return: Content encoding chosen
+		:rtype: str
+		"""
+		encoding = const.API_RDF_IDENTITY_ENCODING
+		quality = 0
+		for candidate in sorted(self.variants, key=lambda candidate: len(self.variants[candidate][0])):
+			candidate_quality = accept_encodings[candidate]
+			if candidate == const.API_RDF_IDENTITY_ENCODING and accept_encodings.find(candidate) < 0:
+				candidate_quality = max(candidate_quality, const.API_RDF_IDENTITY_QUALITY)
+			if candidate_quality > quality:
+				encoding, quality = candidate, candidate_quality
+		return encoding
+
+	@staticmethod
+	def _decompress(encoding, content):
+		"""
+		Decompresses the content of a compressed version of the file.
+
+		:param str encoding: Content encoding of the version
+		:param bytes content: Compressed content
+		:return: Decompressed content
+		:rtype: bytes
+		"""
+		if encoding == const.RDF_FILE_ENCODING_GZIP:
+			return gzip.decompress(content)
+		return brotli.decompress(content)
+
+	@staticmethod
+	def _get_catalogue_date(content):
+		"""
+		Obtains from an RDF/XML the last time the catalogue was modified (or issued if it was never modified).
+
+		:param bytes content: RDF/XML file content
+		:return: Catalogue date or None if it is not found
+		:rtype: datetime or None
+		"""
+		catalogue = re.search(const.API_RDF_CATALOGUE_REGEX, content, re.DOTALL)
+		if catalogue is None:
+			return None
+		for regex in (const.API_RDF_MODIFIED_REGEX, const.API_RDF_ISSUED_REGEX):
+			date = re.search(regex, catalogue.group(0))
+			if date is not None:
+				try:
+					return datetime.strptime(date.group(1).decode('utf8'), const.API_RDF_DATE_FORMAT).replace(
+						tzinfo=timezone.utc)
+				except ValueError:
+					return None
+		return None
@@ -186,14 +186,15 @@ def new_config(ctx, overwrite):
 
 
 @cli.command(name='show_integrated', help_priority=5)
-def show_integrated_datamodels():
+@click.pass_context
+def show_integrated_datamodels(ctx):
 	"""
 	Shows already integrated Data Models.
 
 	Prints which are the Data Models present in the RDF/XML. It is necessary to launch the integration at least once to
 	get some output here.
 	"""
-	datamodels = EDP.get_integrated_datamodels()
+	datamodels = EDP.get_integrated_datamodels(ctx.obj['config'])
 	if not len(datamodels):
 		click.echo(msg.COMMANDS_SHOW_INTEGRATED_DATAMODELS_EMPTY)
 	else:
@@ -203,5 +204,19 @@ def show_integrated_datamodels():
 	click.echo()
 
 
+@cli.command(name='migrate_ids', help_priority=6)
+@click.option('--source', '-s', type=click.Path(exists=True, dir_okay=False), help=msg.COMMANDS_HELP_MIGRATE_IDS_SOURCE)
+@click.pass_context
+def migrate_ids(ctx, source):
+	"""
+	Migrates datasets IDs to the store set in configuration file.
+
+	Copies the IDs of the integrated datasets from the ini file used by default into the store set in the configuration
+	file (ids.store and ids.path keys), so the datasets already integrated are kept when switching to the SQLite store.
+	IDs already present in that store for the same Data Models are replaced.
+	"""
+	EDP.migrate_datasets_ids(ctx.obj['config'], source)
+
+
 if __name__ == '__main__':
 	cli(obj={})
@@ -11,8 +11,30 @@ URI_STRUCTURE = 'uri.structure'
 URI_HOST = 'uri.host'
 INTEGRATION_API = 'integration.api'
 INTEGRATION_ORION = 'integration.orion'
+IDS_STORE = 'ids.store'
+IDS_STORE_PATH = 'ids.path'
+
+API_SECTION = 'api'
+API_PAGE_WORKERS = 'page-workers'
+API_PAGE_SIZE = 'page-size'
+API_PAGE_MIN_SIZE = 'page-min-size'
+API_PAGE_MAX_CONTENT = 'page-max-content'
+API_STREAMING = 'streaming'
+API_MAX_ENTITIES = 'max-entities'
+API_SESSION_POOL_SIZE = 'pool-size'
+API_SESSION_ASYNC_POOL_SIZE = 'async-pool-size'
+API_SESSION_KEEP_ALIVE = 'keep-alive'
+API_SESSION_CONNECT_TIMEOUT = 'connect-timeout'
+API_SESSION_READ_TIMEOUT = 'read-timeout'
+API_SESSION_RETRIES = 'retries'
+API_SESSION_RETRY_BACKOFF = 'retry-backoff'
+API_LOG_LEVEL = 'log-level'
+API_CACHE_SIZE = 'cache-size'
+API_CACHE_TTL = 'cache-ttl'
+API_CACHE_MAX_TTL = 'cache-max-ttl'
 
 CATALOGUE_SECTION = 'catalogue'
+NOT_DATAMODEL_SECTIONS = frozenset([MAIN_SECTION, CATALOGUE_SECTION, API_SECTION])
 CATALOGUE_TITLE = 'title'
 CATALOGUE_DESCRIPTION = 'description'
 CATALOGUE_PUBLISHER_NAME = 'publisher-name'
@@ -38,6 +60,7 @@ DATASET_THEMES = 'dataset.themes'
 DATASET_ACCESS_RIGHTS = 'dataset.access-rights'
 DATASET_PERIODICITY = 'dataset.periodicity'
 DATASET_SPATIAL = 'dataset.spatial'
+DATASET_SPATIAL_SIMPLIFICATION = 'dataset.spatial-simplification'
 DATASET_LANDING_PAGE = 'dataset.landing-page'
 DATASET_ALLOCATION = 'dataset.allocation'
 DATASET_ID = 'dataset.id'
@@ -119,6 +142,7 @@ DATAMODELS = {
 		'allocation': ['category']
 	},
 }
+CATALOGUE_DATASETS_WORKERS = 8
 DATAMODELS_DEFAULT = {
 	'models': '',
 	'allocation': ['category', 'location']
@@ -169,6 +193,30 @@ DATASET_FREQUENCY_RELATION = {
 	'decennial': 'http://publications.europa.eu/resource/authority/frequency/DECENNIAL',
 	'provisional': 'http://publications.europa.eu/resource/authority/frequency/OP_DATPRO'
 }
+API_CACHE_PERIOD_RELATION = {
+	'decennial': 10 * 365 * 24 * 3600,
+	'quinquennial': 5 * 365 * 24 * 3600,
+	'quadrennial': 4 * 365 * 24 * 3600,
+	'triennial': 3 * 365 * 24 * 3600,
+	'biennial': 2 * 365 * 24 * 3600,
+	'annual': 365 * 24 * 3600,
+	'semiannual': 182 * 24 * 3600,
+	'three_times_year': 121 * 24 * 3600,
+	'quarterly': 91 * 24 * 3600,
+	'bimonthly': 61 * 24 * 3600,
+	'monthly': 30 * 24 * 3600,
+	'semimonthly': 15 * 24 * 3600,
+	'biweekly': 14 * 24 * 3600,
+	'three_times_month': 10 * 24 * 3600,
+	'weekly': 7 * 24 * 3600,
+	'semiweekly': 84 * 3600,
+	'three_times_week': 56 * 3600,
+	'daily': 24 * 3600,
+	'twice_day': 12 * 3600,
+	'hourly': 3600,
+	'continuously': 10,
+	'continuous': 10
+}
 DATASET_ACCESS_RIGHTS_RELATION = {
 	'public': 'http://publications.europa.eu/resource/authority/access-right/PUBLIC',
 	'restricted': 'http://publications.europa.eu/resource/authority/access-right/RESTRICTED',
@@ -221,6 +269,24 @@ RDF_LICENSE = 'dct:license'
 RDF_ORGANIZATION_NAME = 'foaf:name'
 RDF_ELEMENT_XPATH = './/{element}'
 RDF_ATTRIBUTE_XPATH = '{element}[@{attribute}="{value}"]'
+RDF_TEMPLATE_NODES = (RDF_CATALOGUE, RDF_DATASET, RDF_RESOURCE, RDF_ORGANIZATION)
+RDF_WRITER_DECLARATION = '<?xml version="1.0" encoding="utf-8"?>\n'
+RDF_WRITER_WHITESPACE_REGEX = r'(>|&gt;)(\t|\n|\r|\s)*(<|&lt;)'
+RDF_WRITER_WHITESPACE = ' \t\n\r\f\v'
+RDF_WRITER_BUFFER_SIZE = 64 * 1024
+VALIDATORS_URL_REGEX = (r'^(?:http|ftp)s?://'
+						r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|'
+						r'localhost|'
+						r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'
+						r'(?::\d+)?'
+						r'(?:/?|[/?]\S+)$')
+VALIDATORS_CACHE_SIZE = 1024
+SPATIAL_GEOJSON_JSON = '{{"type":"{type}","coordinates":{coordinates}}}'
+SPATIAL_GEOJSON_DEPTHS = {'Point': 0, 'MultiPoint': 1, 'LineString': 1, 'MultiLineString': 2, 'Polygon': 2,
+						  'MultiPolygon': 3}
+SPATIAL_SIMPLIFICATION_BBOX = 'bbox'
+SPATIAL_SIMPLIFICATION_TYPES = {'LineString': False, 'MultiLineString': False, 'Polygon': True, 'MultiPolygon': True}
+SPATIAL_SIMPLIFICATION_MIN_RING_POSITIONS = 4
 
 from enum import Enum
 
@@ -233,22 +299,100 @@ class Allocation(Enum):
 	CATEGORY = 'category'
 	LOCATION = 'location'
 
+API_BOOLEAN_VALUES = {'true': True, 'yes': True, 'false': False, 'no': False}
 API_FIWARE_TOTAL_COUNT_HEADER = 'Fiware-Total-Count'
 API_FIWARE_RESPONSE_IGNORE_HEADERS = ['Content-Encoding', 'Transfer-Encoding']
 API_FIWARE_SERVICE = 'fiware-service'
 API_FIWARE_SERVICEPATH = 'fiware-servicepath'
-API_FIWARE_URL_STRUCTURE = '{host}/v2/entities?type={entity}&options=keyValues&options=count&offset={offset}&limit={limit}'
-API_FIWARE_URL_STRUCTURE_LOCATION = '&q=address.addressRegion=={location}&q=address.addressLocality=={location}'
+API_FIWARE_URL_STRUCTURE = '{host}/v2/entities'
+API_FIWARE_URL_OPTIONS = ('keyValues', 'count')
+API_FIWARE_URL_LOCATION_FILTERS = ('address.addressRegion=={location}', 'address.addressLocality=={location}')
+API_FIWARE_PARAMS_REGEXES = {
+	'attrs': r'[^\s<>"\'=;(),]+(,[^\s<>"\'=;(),]+)*',
+	'q': r'[^\s"()][^"()\x00-\x1f]*',
+	'mq': r'[^\s"()][^"()\x00-\x1f]*',
+	'georel': r'near(;(maxDistance|minDistance):\d+(\.\d+)?)+|coveredBy|intersects|equals|disjoint',
+	'geometry': r'point|line|polygon|box',
+	'coords': r'-?\d+(\.\d+)?,-?\d+(\.\d+)?(;-?\d+(\.\d+)?,-?\d+(\.\d+)?)*',
+	'orderBy': r'!?[^\s<>"\'=;(),!]+(,!?[^\s<>"\'=;(),!]+)*'
+}
+API_FIWARE_PARAMS_GEO = ('georel', 'geometry', 'coords')
+API_FIWARE_PARAMS_SAFE_CHARS = ',;:=!\'*'
+API_FIWARE_PARAMS_MAX_LENGTH = 2048
+API_FIWARE_MAX_LIMIT = 1000
+API_FIWARE_LIMIT_ERROR = 'limit'
 API_URL_STRUCTURE_FIWARE_SERVICE = '?fs={value}'
 API_URL_STRUCTURE_FIWARE_SERVICEPATH = '&fp={value}'
 API_URL_STRUCTURE = '/<regex("[\w\-\.~:/?#\[\]@!$&\'()*+,;=]*/?"):rel_path>api/{route}'
 API_URL_STATUS = 'status'
+API_URL_NEXT = 'next/<token>'
+API_URL_NEXT_STRUCTURE = '/{rel_path}api/next/{token}'
+API_LINK_NEXT = '<{url}>; rel="next"'
+API_STREAM_ABORTED_BODY = (b'\n{"error":"PageNotFetched",'
+						   b'"description":"Response aborted: a page of the complete request could not be fetched"}\n')
+API_PAGE_WORKERS_DEFAULT = 4
+API_PAGE_SIZE_DEFAULT = 1000
+API_PAGE_MIN_SIZE_DEFAULT = 100
+API_PAGE_MAX_CONTENT_DEFAULT = 8.0
+API_STREAMING_DEFAULT = False
+API_MAX_ENTITIES_DEFAULT = 0
+API_SESSION_POOL_SIZE_DEFAULT = 10
+API_SESSION_ASYNC_POOL_SIZE_DEFAULT = 200
+API_SESSION_KEEP_ALIVE_DEFAULT = True
+API_SESSION_CONNECT_TIMEOUT_DEFAULT = 5.0
+API_SESSION_READ_TIMEOUT_DEFAULT = 60.0
+API_SESSION_RETRIES_DEFAULT = 3
+API_SESSION_RETRY_BACKOFF_DEFAULT = 0.5
+API_SESSION_RETRY_STATUSES = (502, 503, 504)
+API_LOG_LEVEL_DEFAULT = 'INFO'
+API_LOG_FORMAT = '%(asctime)s %(levelname)-8s [%(module)s] %(message)s'
+API_CACHE_SIZE_DEFAULT = 64
+API_CACHE_TTL_DEFAULT = 60
+API_CACHE_MAX_TTL_DEFAULT = 3600
+API_CACHE_HEADER = 'X-Cache'
+API_URL_CACHE_STATUS = 'status/cache'
+API_RDF_CATALOGUE_REGEX = rb'<dcat:Catalog\b.*?</dcat:Catalog>'
+API_RDF_MODIFIED_REGEX = rb'<dct:modified\b[^>]*>([^<]+)</dct:modified>'
+API_RDF_ISSUED_REGEX = rb'<dct:issued\b[^>]*>([^<]+)</dct:issued>'
+API_RDF_DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+API_RDF_IDENTITY_ENCODING = 'identity'
+API_RDF_IDENTITY_QUALITY = 0.001
+API_ASYNC_URL_STRUCTURE = r'/(?P<rel_path>[\w\-\.~:/?#\[\]@!$&\'()*+,;=]*/?)api/{route}'
+API_ASYNC_URL_ENTITY = r'(?P<orion>[^/]+)/entity/(?P<datamodel>[^/]+)'
+API_ASYNC_URL_LOCATION = r'/location/(?P<location>[^/]+)'
+API_ASYNC_URL_NEXT = r'next/(?P<token>[^/]+)'
+API_ASYNC_METHODS = ('GET', 'HEAD')
+API_ASYNC_HOP_BY_HOP_HEADERS = frozenset(['connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization', 'te',
+										  'trailers', 'transfer-encoding', 'upgrade'])
 CONFIG_FILE_DEFAULT_PATH = '/etc/cb_edp.ini'
+CONFIG_FILE_ENVIRONMENT_VARIABLE = 'CB_EDP_CONFIG'
 CONFIG_FILE_TEMPLATE_PATH = '/config/template.ini'
 CONFIG_FILE_DATASETS_IDS_PATH = '/config/integrated.ini'
+CONFIG_FILE_DATASETS_IDS_MODE = 0o644
+CONFIG_FILE_DATASETS_IDS_DATABASE_PATH = '/config/integrated.db'
+IDS_STORE_INI = 'ini'
+IDS_STORE_SQLITE = 'sqlite'
+IDS_STORES = (IDS_STORE_INI, IDS_STORE_SQLITE)
+IDS_STORE_LOCK_EXTENSION = '.lock'
+IDS_STORE_SQLITE_TIMEOUT = 600
+IDS_STORE_SQLITE_WAL = 'PRAGMA journal_mode=WAL'
+IDS_STORE_SQLITE_CREATE = ('CREATE TABLE IF NOT EXISTS datasets_ids (position INTEGER PRIMARY KEY, '
+						   'datamodel TEXT NOT NULL UNIQUE, id TEXT NOT NULL)')
+IDS_STORE_SQLITE_BEGIN = 'BEGIN IMMEDIATE'
+IDS_STORE_SQLITE_COMMIT = 'COMMIT'
+IDS_STORE_SQLITE_ROLLBACK = 'ROLLBACK'
+IDS_STORE_SQLITE_SELECT = 'SELECT id FROM datasets_ids WHERE datamodel = ?'
+IDS_STORE_SQLITE_SELECT_DATAMODELS = 'SELECT datamodel FROM datasets_ids ORDER BY position'
+IDS_STORE_SQLITE_UPSERT = ('INSERT INTO datasets_ids (datamodel, id) VALUES (?, ?) '
+						   'ON CONFLICT (datamodel) DO UPDATE SET id = excluded.id')
+IDS_STORE_SQLITE_DELETE = 'DELETE FROM datasets_ids WHERE datamodel = ?'
 RDF_FILE_NAME = 'catalogue.rdf'
 RDF_FILE_PATH = '/api/' + RDF_FILE_NAME
 RDF_FILE_TEMPLATE_PATH = '/core/rdf/template.xml'
+RDF_FILE_MODE = 0o644
+RDF_FILE_ENCODING_BROTLI = 'br'
+RDF_FILE_ENCODING_GZIP = 'gzip'
+RDF_FILE_ENCODINGS = {RDF_FILE_ENCODING_BROTLI: '.br', RDF_FILE_ENCODING_GZIP: '.gz'}
 URI_STRUCTURE_DEFAULT = 'http://{host}/cb/'
 
 DEFAULT_DATAMODEL_OPTION_COMMAND = 'all'
@@ -0,0 +1,429 @@
+import os
+import sqlite3
+import threading
+from abc import ABC
+from abc import abstractmethod
+from contextlib import contextmanager
+
+from configobj import ConfigObj
+
+import cb_edp.config.constants as const
+from cb_edp.errors.config import NoIDForDataModelError
+from cb_edp.utils.helpers import Helpers
+
+try:
+	import fcntl
+except ImportError:
+	fcntl = None
+
+
+class DatasetsIDsStore(ABC):
+	"""
+	Base class of the stores where the IDs of the integrated datasets are kept by Data Model.
+	Every change is made inside a transaction: changes made inside a with transaction() block are stored together when
+	the block finishes or discarded if an exception is raised inside it, and single changes made outside any block are
+	stored right away in a transaction of their own. Transactions keep other processes (and other threads) from changing
+	the store until they finish, so runs launched at the same time do not overwrite each other's IDs. Reads are not
+	blocked by transactions: inside this process they see the changes made by the transaction in progress.
+	Subclasses implement the storage through the abstract methods starting with an underscore.
+
+	:param str path: Location of the store
+	"""
+
+	def __init__(self, path):
+		"""
+		Initializes DatasetsIDsStore.
+
+		:param str path: Location of the store
+		"""
+		self.path = path
+		self._depth = 0
+		self._lock = threading.RLock()
+
+	@contextmanager
+	def transaction(self):
+		"""
+		Groups the changes made inside a with block, so they are stored at once when the block finishes. If an
+		exception is raised inside the block, every change made is rolled back. Transactions opened inside another one
+		are part of the outermost one.
+
+		:return: None
+		"""
+		with self._lock:
+			if self._depth:
+				self._depth += 1
+				try:
+					yield
+				finally:
+					self._depth -= 1
+				return
+
+			self._begin()
+			try:
+				self._depth = 1
+				try:
+					yield
+				finally:
+					self._depth = 0
+				self._commit()
+			except BaseException:
+				self._rollback()
+				raise
+			finally:
+				self._release()
+
+	def get(self, datamodel):
+		"""
+		Returns the ID of a Data Model.
+
+		:param str datamodel: Data Model to look for
+		:return: ID of the given Data Model or an empty string if it has not been integrated
+		:rtype: str
+		"""
+		if not self._depth:
+			self._refresh()
+		return self._get(datamodel)
+
+	def get_datamodels(self):
+		"""
+		Returns the Data Models with an ID stored (in the order they were stored).
+
+		:return: Data Models integrated
+		:rtype: list[str]
+		"""
+		if not self._depth:
+			self._refresh()
+		return self._get_datamodels()
+
+	def save(self, datamodel, id):
+		"""
+		Stores the ID of a Data Model.
+
+		:param str datamodel: Data Model whose ID will be stored
+		:param str id: Dataset ID to store
+		:return: None
+		"""
+		with self.transaction():
+			self._save(datamodel, id)
+
+	def remove(self, datamodel):
+		"""
+		Removes the ID of a Data Model.
+
+		:param str datamodel: Data Model whose ID will be removed
+		:return: None
+		:raises NoIDForDataModelError:
+		"""
+		with self.transaction():
+			if not self._remove(datamodel):
+				raise NoIDForDataModelError(datamodel)
+
+	def _refresh(self):
+		"""
+		Brings up to date the IDs changed by other processes. Only needed by stores that keep the IDs in memory.
+
+		:return: None
+		"""
+		pass
+
+	@abstractmethod
+	def _begin(self):
+		"""
+		Starts a transaction, keeping other processes from changing the store until it is released.
+
+		:return: None
+		"""
+		pass
+
+	@abstractmethod
+	def _commit(self):
+		"""
+		Stores the changes made inside the transaction in progress.
+
+		:return: None
+		"""
+		pass
+
+	@abstractmethod
+	def _rollback(self):
+		"""
+		Discards the changes made inside the transaction in progress.
+
+		:return: None
+		"""
+		pass
+
+	def _release(self):
+		"""
+		Lets other processes change the store again once the transaction in progress finished. Only needed by stores
+		that lock the store by themselves.
+
+		:return: None
+		"""
+		pass
+
+	@abstractmethod
+	def _get(self, datamodel):
+		"""
+		Reads the ID of a Data Model from the store.
+
+		:param str datamodel: Data Model to look for
+		:return: ID of the given Data Model or an empty string if it has not been integrated
+		:rtype: str
+		"""
+		pass
+
+	@abstractmethod
+	def _get_datamodels(self):
+		"""
+		Reads the Data Models with an ID from the store.
+
+		:return: Data Models integrated (in the order they were stored)
+		:rtype: list[str]
+		"""
+		pass
+
+	@abstractmethod
+	def _save(self, datamodel, id):
+		"""
+		Writes the ID of a Data Model in the store.
+
+		:param str datamodel: Data Model whose ID will be stored
+		:param str id: Dataset ID to store
+		:return: None
+		"""
+		pass
+
+	@abstractmethod
+	def _remove(self, datamodel):
+		"""
+		Deletes the ID of a Data Model from the store.
+
+		:param str datamodel: Data Model whose ID will be removed
+		:return: If the Data Model had an ID
+		:rtype: bool
+		"""
+		pass
+
+
+class IniDatasetsIDsStore(DatasetsIDsStore):
+	"""
+	Store that keeps the datasets IDs in an ini file (one Data Model = ID line each), loaded in memory and read again
+	only when it changes on disk. Transactions hold an exclusive lock on a file next to it (on platforms providing
+	fcntl) and write the whole file atomically when they finish, only if something changed.
+
+	:param str path: Location of the ini file
+	"""
+
+	def __init__(self, path):
+		"""
+		Initializes IniDatasetsIDsStore.
+
+		:param str path: Location of the ini file
+		"""
+		super(IniDatasetsIDsStore, self).__init__(path)
+		self._ids = ConfigObj(path, write_empty_values=True, list_values=False, encoding='utf8', raise_errors=True)
+		self._signature = self._get_signature()
+		self._backup = None
+		self._lock_file = None
+
+	def _get_signature(self):
+		"""
+		Obtains the modification time, inode and size of the ini file.
+
+		:return: Tuple identifying the version of the file (None if it does not exist)
+		:rtype: tuple or None
+		"""
+		try:
+			stat = os.stat(self.path)
+		except FileNotFoundError:
+			return None
+		return stat.st_mtime_ns, stat.st_ino, stat.st_size
+
+	def _refresh(self):
+		"""
+		Loads the ini file again if it changed on disk since it was last read or written.
+
+		:return: None
+		"""
+		signature = self._get_signature()
+		if signature != self._signature:
+			if signature is None:
+				self._ids.clear()
+			else:
+				self._ids.reload()
+			self._signature = signature
+
+	def _begin(self):
+		"""
+		Locks the file next to the ini file (where fcntl is available), loads the ini file again if it changed and keeps
+		a copy of the IDs to roll back to.
+
+		:return: None
+		"""
+		self._lock_file = open(self.path + const.IDS_STORE_LOCK_EXTENSION, 'a')
+		if fcntl is not None:
+			fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+		self._refresh()
+		self._backup = self._ids.dict()
+
+	def _commit(self):
+		"""
+		Writes the whole ini file atomically if any ID changed inside the transaction.
+
+		:return: None
+		"""
+		if self._ids.dict() != self._backup:
+			with Helpers.open_atomically(self.path, const.CONFIG_FILE_DATASETS_IDS_MODE) as file:
+				self._ids.write(file)
+			self._signature = self._get_signature()
+
+	def _rollback(self):
+		"""
+		Restores the IDs kept when the transaction began.
+
+		:return: None
+		"""
+		self._ids.clear()
+		self._ids.update(self._backup)
+
+	def _release(self):
+		"""
+		Unlocks and closes the lock file.
+
+		:return: None
+		"""
+		self._backup = None
+		if fcntl is not None:
+			fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+		self._lock_file.close()
+		self._lock_file = None
+
+	def _get(self, datamodel):
+		"""
+		Reads the ID of a Data Model from the IDs loaded.
+
+		:param str datamodel: Data Model to look for
+		:return: ID of the given Data Model or an empty string if it has not been integrated
+		:rtype: str
+		"""
+		return self._ids.get(datamodel, '')
+
+	def _get_datamodels(self):
+		"""
+		Reads the Data Models of the IDs loaded.
+
+		:return: Data Models integrated (in the order they were stored)
+		:rtype: list[str]
+		"""
+		return list(self._ids.keys())
+
+	def _save(self, datamodel, id):
+		"""
+		Sets the ID of a Data Model in the IDs loaded (written to disk when the transaction is committed).
+
+		:param str datamodel: Data Model whose ID will be stored
+		:param str id: Dataset ID to store
+		:return: None
+		"""
+		self._ids[datamodel] = id
+
+	def _remove(self, datamodel):
+		"""
+		Removes the ID of a Data Model from the IDs loaded (removed from disk when the transaction is committed).
+
+		:param str datamodel: Data Model whose ID will be removed
+		:return: If the Data Model had an ID
+		:rtype: bool
+		"""
+		if datamodel not in self._ids:
+			return False
+		self._ids.pop(datamodel)
+		return True
+
+
+class SQLiteDatasetsIDsStore(DatasetsIDsStore):
+	"""
+	Store that keeps the datasets IDs in a SQLite database (in WAL mode, so readers are not blocked by writers) indexed
+	by Data Model. Transactions take SQLite's write lock as soon as they begin, so other processes wait for them to
+	finish before changing anything.
+
+	:param str path: Location of the database file
+	"""
+
+	def __init__(self, path):
+		"""
+		Initializes SQLiteDatasetsIDsStore creating the database if it does not exist.
+
+		:param str path: Location of the database file
+		"""
+		super(SQLiteDatasetsIDsStore, self).__init__(path)
+		self._connection = sqlite3.connect(path, timeout=const.IDS_STORE_SQLITE_TIMEOUT, isolation_level=None,
+										   check_same_thread=False)
+		self._connection.execute(const.IDS_STORE_SQLITE_WAL)
+		self._connection.execute(const.IDS_STORE_SQLITE_CREATE)
+
+	def _begin(self):
+		"""
+		Begins a SQLite transaction taking the write lock of the database right away.
+
+		:return: None
+		"""
+		self._connection.execute(const.IDS_STORE_SQLITE_BEGIN)
+
+	def _commit(self):
+		"""
+		Commits the SQLite transaction in progress.
+
+		:return: None
+		"""
+		self._connection.execute(const.IDS_STORE_SQLITE_COMMIT)
+
+	def _rollback(self):
+		"""
+		Rolls back the SQLite transaction in progress, if it was begun.
+
+		:return: None
+		"""
+		if self._connection.in_transaction:
+			self._connection.execute(const.IDS_STORE_SQLITE_ROLLBACK)
+
+	def _get(self, datamodel):
+		"""
+		Selects the ID of a Data Model from the database.
+
+		:param str datamodel: Data Model to look for
+		:return: ID of the given Data Model or an empty string if it has not been integrated
+		:rtype: str
+		"""
+		row = self._connection.execute(const.IDS_STORE_SQLITE_SELECT, (datamodel,)).fetchone()
+		return row[0] if row is not None else ''
+
+	def _get_datamodels(self):
+		"""
+		Selects the Data Models with an ID from the database.
+
+		:return: Data Models integrated (in the order they were stored)
+		:rtype: list[str]
+		"""
+		return [row[0] for row in self._connection.execute(const.IDS_STORE_SQLITE_SELECT_DATAMODELS)]
+
+	def _save(self, datamodel, id):
+		"""
+		Inserts or replaces the ID of a Data Model in the database.
+
+		:param str datamodel: Data Model whose ID will be stored
+		:param str id: Dataset ID to store
+		:return: None
+		"""
+		self._connection.execute(const.IDS_STORE_SQLITE_UPSERT, (datamodel, id))
+
+	def _remove(self, datamodel):
+		"""
+		Deletes the ID of a Data Model from the database.
+
+		:param str datamodel: Data Model whose ID will be removed
+		:return: If the Data Model had an ID
+		:rtype: bool
+		"""
+		return self._connection.execute(const.IDS_STORE_SQLITE_DELETE, (datamodel,)).rowcount > 0
@@ -3,10 +3,13 @@ import os
 from configobj import ConfigObj
 from configobj import ConfigObjError
 import cb_edp.config.constants as const
+from cb_edp.config.ids import IniDatasetsIDsStore
+from cb_edp.config.ids import SQLiteDatasetsIDsStore
 from cb_edp.errors.config import ConfigFilePathError
-from cb_edp.errors.config import NoIDForDataModelError
 from cb_edp.errors.config import SectionKeyError
+from cb_edp.errors.config import WrongFormatError
 from cb_edp.utils.helpers import Helpers
+from cb_edp.utils.validators import Validators
 
 
 class ConfigManager:
@@ -50,14 +53,22 @@ class ConfigManager:
 	@classmethod
 	def get_datasets_ids_instance(cls):
 		"""
-		Singleton method that retrieves the ConfigManager instance for the datasets IDs storing file.
-		If it is not instantiated yet, it does it with the the static defined path.
+		Singleton method that retrieves the store of the datasets IDs.
+		If it is not instantiated yet, it does it with the backend and location set in main section of the config file
+		(or the ini file at the static defined path if they are not set).
 
-		:return: The ConfigManager class singleton.
-		:rtype: ConfigManager
+		:return: The datasets IDs store singleton.
+		:rtype: DatasetsIDsStore
+		:raises NotExpectedValueError:
 		"""
 		if cls.__datasets_ids is None:
-			cls.__datasets_ids = ConfigManager(Helpers.get_datasets_ids_file_path())
+			store = cls._get_optional_value(const.MAIN_SECTION, const.IDS_STORE, const.IDS_STORE_INI)
+			Validators.is_expected_value(const.IDS_STORE, store, const.IDS_STORES)
+			path = cls._get_optional_value(const.MAIN_SECTION, const.IDS_STORE_PATH)
+			if store == const.IDS_STORE_SQLITE:
+				cls.__datasets_ids = SQLiteDatasetsIDsStore(path or Helpers.get_datasets_ids_database_path())
+			else:
+				cls.__datasets_ids = IniDatasetsIDsStore(path or Helpers.get_datasets_ids_file_path())
 		return cls.__datasets_ids
 
 	@classmethod
@@ -116,6 +127,25 @@ class ConfigManager:
 		except KeyError:
 			raise SectionKeyError(section, key)
 
+	@classmethod
+	def _get_optional_value(cls, section, key, default=''):
+		"""
+		Reads a value from the config file that may not be present (e.g. in config files generated by older versions).
+		If the config file location was not set yet, default value is returned.
+
+		:param str section: Section where the key is located in config file
+		:param str key: Name of the key whose value has to be returned
+		:param str default: Value returned if the key is not present or not informed
+		:return: The value of the corresponding section-key
+		:rtype: str
+		"""
+		if cls.__config_file_path is None:
+			return default
+		try:
+			return cls.get_value(section, key, default)
+		except SectionKeyError:
+			return default
+
 	@classmethod
 	def get_keys(cls, section):
 		"""
@@ -138,8 +168,53 @@ class ConfigManager:
 		sections = cls._get_configobj(cls.get_instance()).keys()
 		for section in [const.MAIN_SECTION, const.CATALOGUE_SECTION]:
 			sections.remove(section)
+		if const.API_SECTION in sections:
+			sections.remove(const.API_SECTION)
 		return sections
 
+	@classmethod
+	def is_datamodel(cls, section):
+		"""
+		Checks if a section of the configuration file is a Data Model without building the list of every Data Model.
+
+		:param str section: Section to check
+		:return: Whether the section is a Data Model
+		:rtype: bool
+		"""
+		return section not in const.NOT_DATAMODEL_SECTIONS and section in cls._get_configobj(cls.get_instance())
+
+	@classmethod
+	def get_api_value(cls, key, default):
+		"""
+		Reads a value from the optional API section of the config file.
+		If the config file location was not set yet (as it happens in API processes), it is taken from the environment
+		variable defined in constants or, failing that, from the default location. If either the file, the section or
+		the key are not present, default value is returned.
+
+		:param str key: Name of the key whose value has to be returned
+		:param int or float or str default: Value returned if the key is not informed (it also sets the returned type)
+		:return: The value of the key in API section casted to default value's type
+		:rtype: int or float or str
+		:raises WrongFormatError:
+		"""
+		try:
+			if cls.__config_file_path is None:
+				cls.set_config_path(os.environ.get(const.CONFIG_FILE_ENVIRONMENT_VARIABLE, const.CONFIG_FILE_DEFAULT_PATH))
+			value = cls.get_value(const.API_SECTION, key)
+		except (ConfigFilePathError, SectionKeyError):
+			return default
+
+		if not value:
+			return default
+		if type(default) is bool:
+			if value.lower() not in const.API_BOOLEAN_VALUES:
+				raise WrongFormatError(key, value)
+			return const.API_BOOLEAN_VALUES[value.lower()]
+		try:
+			return type(default)(value)
+		except ValueError:
+			raise WrongFormatError(key, value)
+
 	@classmethod
 	def update_file(cls):
 		"""
@@ -152,44 +227,37 @@ class ConfigManager:
 	@classmethod
 	def get_dataset_id(cls, datamodel):
 		"""
-		Reads from the datasets IDs file the ID for a Data Model.
+		Reads from the datasets IDs store the ID for a Data Model.
 
 		:param str datamodel: Data Model to look for
 		:return: ID of the given Data Model
 		:rtype: str
 		"""
-		ids = cls._get_configobj(cls.get_datasets_ids_instance())
-		if datamodel in ids:
-			return ids[datamodel]
-		else:
-			return ''
+		return cls.get_datasets_ids_instance().get(datamodel)
 
 	@classmethod
 	def save_dataset_id(cls, datamodel, id):
 		"""
-		Saves the ID of a dataset/Data Model in the datasets IDs file writing it on disk.
+		Saves the ID of a dataset/Data Model in the datasets IDs store (when the current transaction finishes if there
+		is one).
 
 		:param str datamodel: Data Model whose ID will be stored
 		:param str id: Dataset ID to store
 		:return: None
 		"""
-		ids = cls._get_configobj(cls.get_datasets_ids_instance())
-		ids[datamodel] = id
-		ids.write()
+		cls.get_datasets_ids_instance().save(datamodel, id)
 
 	@classmethod
 	def remove_dataset_id(cls, datamodel):
 		"""
-		Removes from the datasets IDs file the entry of a given Data Model.
+		Removes from the datasets IDs store the entry of a given Data Model (when the current transaction finishes if
+		there is one).
 
 		:param str datamodel: Data Model whose ID will be removed
 		:return: None
+		:raises NoIDForDataModelError:
 		"""
-		ids = cls._get_configobj(cls.get_datasets_ids_instance())
-		if datamodel not in ids:
-			raise NoIDForDataModelError(datamodel)
-		ids.pop(datamodel)
-		ids.write()
+		cls.get_datasets_ids_instance().remove(datamodel)
 
 	@classmethod
 	def get_integrated_datasets(cls):
@@ -199,5 +267,17 @@ class ConfigManager:
 		:return: List with the Data Models integrated
 		:rtype: list[str]
 		"""
-		ids = cls._get_configobj(cls.get_datasets_ids_instance())
-		return list(ids.keys())
+		return cls.get_datasets_ids_instance().get_datamodels()
+
+	@classmethod
+	def datasets_ids_transaction(cls):
+		"""
+		Groups the changes made to the datasets IDs inside a with block, so the datasets IDs store is written only once
+		when the block finishes. If an exception is raised inside the block, every change made is rolled back and the
+		store is left as it was. Meanwhile, other processes cannot change the store. Transactions opened inside another
+		one are part of the outermost one.
+
+		:return: Context manager of the transaction
+		:rtype: contextlib.AbstractContextManager
+		"""
+		return cls.get_datasets_ids_instance().transaction()
@@ -6,6 +6,7 @@ COMMANDS_HELP_DATAMODELS = 'Name of the Data Models to {command} separated by bl
 COMMANDS_HELP_OVERWRITE = 'Ignore confirmation and overwrite existing file.'
 COMMANDS_SHOW_INTEGRATED_DATAMODELS = 'Data Models available in the RDF file:'
 COMMANDS_SHOW_INTEGRATED_DATAMODELS_EMPTY = 'You have not integrated any Data Models yet.'
+COMMANDS_HELP_MIGRATE_IDS_SOURCE = 'The datasets IDs ini file to migrate from (the one inside the installed package by default).  [optional]'
 
 # edp.py
 EDP_INITIALIZING = 'Initializing CB-EDP integration process (instantiating EDP core class)'
@@ -23,16 +24,49 @@ EDP_DELETE_FINISHED_OK = 'Integration removal process finished successfully'
 EDP_DELETE_FINISHED_KO = 'Integration removal process finished with errors'
 EDP_CONFIG_FILE_GENERATION = 'Configuration file created successfully at {path}'
 EDP_CONFIG_FILE_GENERATION_FAILED = 'Cannot create configuration file: Permission denied'
+EDP_MIGRATE_IDS_START = 'Migrating datasets IDs from {source} to {path}'
+EDP_MIGRATE_IDS_SAME_STORE = 'Datasets IDs store set in config file is already {source}. Nothing to migrate'
+EDP_MIGRATE_IDS_FINISHED_OK = '{ids} datasets ID/s migrated successfully'
+EDP_MIGRATE_IDS_FINISHED_KO = 'Datasets IDs migration finished with errors (no ID was migrated)'
 EDP_ERROR_INSTANTIATING_LOGGER = "{date} ERROR    [{script}] Permission denied: you must run cb-edp as sudoer"
 
 # /api/main.py
 API_STATUS_OK = 'CB-EDP API service running'
+API_PAGE_REQUEST_FAILED = 'Complete request to {url} aborted: a page could not be fetched ({error})'
+API_CACHE_TTLS_NOT_LOADED = 'Data Models periodicity could not be read from config file (using default cache TTL): {error}'
+API_RDF_RELOAD = 'RDF/XML file changed on disk, loading it again from {path}'
+API_RDF_COMPRESSED_OUTDATED = 'Compressed RDF/XML file at {path} does not match current RDF file (ignoring it)'
+API_PAGE_NOT_ARRAY = 'Complete request to {url} aborted: Orion returned a page that is not a JSON array'
+API_PAGE_SIZE_REJECTED = 'Orion at {host} did not return a page of {size} entities ({reason}), trying with {new_size}'
+API_PAGE_SIZE_PROBED = 'Orion at {host} returns pages of {size} entities'
+API_PAGE_SIZE_REDUCED = 'Page size for Orion at {host} reduced from {size} to {new_size} entities: {reason}'
+API_PAGE_SIZE_REASON_TIMEOUT = 'a page timed out'
+API_PAGE_SIZE_REASON_TOO_LARGE = 'a page weighed {size:.2f} MB (maximum {max:.2f} MB)'
+API_ENTITIES_CAPPED = 'Complete request to {url} returns entities from {offset} to {stop} of {count}, the rest are linked as next'
+API_STREAM_ABORTED = 'Streamed response to {path} aborted after sending {size} bytes: its JSON array is left unfinished'
+API_NEXT_TOKEN_NOT_VALID = 'Continuation token {token} is not valid: {error}'
+API_ORION_PARAM_NOT_VALID = 'Orion parameter {name} is not valid: {value}'
+API_ORION_GEO_PARAMS_INCOMPLETE = 'Orion geographical query needs every one of {params} parameters'
+
+# /api/aio.py
+API_ASYNC_REQUEST_FAILED = 'Request to {path} failed: {error}'
+
+# /utils/sessions.py
+SESSIONS_NEW_SESSION = 'Opening new pooled HTTP session for {host}'
+SESSIONS_NEW_ASYNC_SESSION = 'Opening new pooled asynchronous HTTP session (up to {connections} connections)'
+SESSIONS_ASYNC_SESSION_NOT_AVAILABLE = 'Asynchronous API requires aiohttp module to be installed (pip install aiohttp)'
+SESSIONS_REQUEST_RETRY = '{method} {url} failed ({error}), retrying in {time:.1f} s'
+SESSIONS_REQUEST_LATENCY = '{method} {url} answered {status} in {time:.1f} ms'
 
 # /errors/api.py
 API_COULD_NOT_READ_RDF_SHORT_ERROR = 'Error trying to access RDF file'
 API_COULD_NOT_READ_RDF_ERROR = 'There was an error trying to access the RDF/XML: file not found in filesystem.'
 API_PROCESS_FAILED_SHORT_ERROR = 'Error during query processing'
 API_PROCESS_FAILED_ERROR = 'There was an error processing your query. Check API service logs or contact application administrator.'
+API_QUERY_NOT_VALID_SHORT_ERROR = 'Query not valid'
+API_ORION_PARAM_NOT_VALID_ERROR = 'Orion parameter {name} of your query is not well-formatted.'
+API_ORION_GEO_PARAMS_INCOMPLETE_ERROR = 'Geographical queries need every one of {params} parameters.'
+API_NEXT_TOKEN_NOT_VALID_ERROR = 'Continuation token of your query is not valid. Use the URL of the Link header of the previous response.'
 
 # /errors/config.py
 CONFIG_FILE_PATH_ERROR = 'There was a problem with the path to config file: {path}'
@@ -77,6 +111,9 @@ SERIALIZER_RDF_UPDATE_NEW_DATASET = 'Adding new dataset to RDF file: {dataset}'
 SERIALIZER_RDF_UPDATE_FINISHED = 'RDF file update with "{dataset}" dataset finished successfully'
 SERIALIZER_RDF_REMOVE_START = 'Removing "{dataset}" dataset from already created RDF file'
 SERIALIZER_RDF_REMOVE_FINISHED = '"{dataset}" dataset removal from RDF file process finished successfully'
+SERIALIZER_RDF_STREAM_REMOVE_START = 'Removing "{datasets}" datasets from RDF file node by node'
+SERIALIZER_RDF_STREAM_REMOVE_NODE = 'Skipping node {uri} when copying RDF file'
+SERIALIZER_RDF_STREAM_REMOVE_FINISHED = 'Datasets removal from RDF file process finished successfully'
 SERIALIZER_LOAD_TREE = 'Loading tree from {path} XML file'
 SERIALIZER_CATALOGUE_SERIALIZE_START = 'Serializing new catalogue for {datamodels} Data Models'
 SERIALIZER_CATALOGUE_SERIALIZE_FINISHED = 'Catalogue serialization finished successfully'
@@ -103,3 +140,5 @@ SERIALIZER_PUBLISHER_NODE_APPEARANCES = '<dct:publisher> node appears {times} ti
 HELPERS_SPATIAL_GEOJSON_NODES = 'There is more than one drawable object (feature) in the GeoJSON provided at {path}. Using only the first one'
 HELPERS_SPATIAL_GEOJSON_NOT_FOUND = 'GeoJSON could not be located in {path} file. Is it in JSON file provided? It should be at first place'
 HELPERS_SPATIAL_GEOJSON_FILE_NOT_FOUND = 'There was an error trying to access GeoJSON file specified in {path}'
+HELPERS_SPATIAL_CACHE_HIT = 'Using already loaded geometry from GeoJSON file {path}'
+HELPERS_SPATIAL_SIMPLIFIED = 'Geometry from GeoJSON file {path} simplified ({simplification}): {removed} of {total} points removed'
@@ -1,18 +1,20 @@
 import logging
+import os
 import sys
 from datetime import datetime
 from shutil import copyfile
 
-import requests
-
 import cb_edp.config.constants as const
 import cb_edp.config.messages as msg
+from cb_edp.api.builder import APIBuilder
+from cb_edp.config.ids import IniDatasetsIDsStore
 from cb_edp.config.manager import ConfigManager
+from cb_edp.errors.config import ConfigFilePathError
 from cb_edp.errors.core.rdf import LastDatasetError
 from cb_edp.models.catalogue import Catalogue
-from cb_edp.models.dataset import Dataset
 from cb_edp.core.rdf.serializer import Serializer
 from cb_edp.utils.helpers import Helpers
+from cb_edp.utils.sessions import SessionManager
 from cb_edp.utils.validators import Validators
 from cb_edp.utils.loggers import config_logging
 
@@ -33,6 +35,7 @@ class EDP(object):
             logging.debug(msg.EDP_INITIALIZING)
             logging.debug(msg.EDP_READING_CONFIG.format(path=file_path))
             ConfigManager.set_config_path(file_path)
+            APIBuilder.reset_context()
 
             Validators.is_informed(const.URI_STRUCTURE,
                                    ConfigManager.get_value(const.MAIN_SECTION, const.URI_STRUCTURE))
@@ -45,7 +48,8 @@ class EDP(object):
 
             integration_api = integration_api.strip('/')
             logging.debug(msg.EDP_CHECK_API_STATUS.format(host=integration_api))
-            response = requests.get('{host}/{route}'.format(host=integration_api, route=const.API_URL_STATUS))
+            response = SessionManager.request('get', '{host}/{route}'.format(host=integration_api,
+                                                                              route=const.API_URL_STATUS))
             if response.status_code != 200:
                 logging.warning(msg.EDP_API_STATUS_DOWN.format(host=integration_api))
         except ValueError:
@@ -62,7 +66,8 @@ class EDP(object):
 		Core function that integrates a new RDF file with a collection of Data Models.
 		It removes every previously stored dataset ID. Then, it checks if the param passed is the Data Models'
 		collection or 'all' value (to integrate every Data Model in config file). At last, it serializes the Data Models
-		passed by and writes the entire new RDF into the filesystem.
+		passed by and writes the entire new RDF into the filesystem. Datasets IDs changes are stored at once when the RDF
+		has been written, and discarded if anything fails.
 
 		:param tuple datamodels: Data Models that will be added to the RDF file
 		:return: None
@@ -70,13 +75,14 @@ class EDP(object):
         logging.info(msg.EDP_INTEGRATION_START.format(datamodels=', '.join(datamodels)))
 
         try:
-            already_integrated = ConfigManager.get_integrated_datasets()
-            for dataset in already_integrated:
-                ConfigManager.remove_dataset_id(dataset)
-            datamodels = EDP.check_datamodels_parameter(datamodels, False)
-            catalogue = Catalogue(datamodels)
-            rdf = Serializer.serialize_rdf_create(catalogue)
-            Serializer.write_rdf(rdf)
+            with ConfigManager.datasets_ids_transaction():
+                already_integrated = ConfigManager.get_integrated_datasets()
+                for dataset in already_integrated:
+                    ConfigManager.remove_dataset_id(dataset)
+                datamodels = EDP.check_datamodels_parameter(datamodels, False)
+                catalogue = Catalogue(datamodels)
+                rdf = Serializer.serialize_rdf_create(catalogue)
+                Serializer.write_rdf(rdf)
             logging.info(msg.EDP_INTEGRATION_FINISHED_OK)
         except Exception as error:
             logging.error(error)
@@ -87,7 +93,8 @@ class EDP(object):
 		Core function that modifies an existing RDF file with new Data Models or upgrades of already existing ones.
 		It checks if the param passed is the Data Models' collection or 'all' value (to work with every Data Model in
 		config file). Then it modifies the current RDF file with the new datasets and writes the new version of the RDF
-		into the filesystem.
+		into the filesystem. Datasets IDs changes are stored at once when the RDF has been written, and discarded if
+		anything fails.
 
 		:param tuple datamodels: Data Models that will be added to or modified in the RDF file
 		:return: None
@@ -95,12 +102,11 @@ class EDP(object):
         logging.info(msg.EDP_MODIFICATION_START.format(datamodels=', '.join(datamodels)))
 
         try:
-            rdf = None
             datamodels = EDP.check_datamodels_parameter(datamodels, False)
-            for datamodel in datamodels:
-                dataset = Dataset(datamodel)
-                rdf = Serializer.serialize_rdf_update(dataset, rdf)
-            Serializer.write_rdf(rdf)
+            with ConfigManager.datasets_ids_transaction():
+                datasets = Catalogue.create_datasets(datamodels)
+                rdf = Serializer.serialize_rdf_batch_update(datasets)
+                Serializer.write_rdf(rdf)
             logging.info(msg.EDP_MODIFICATION_FINISHED_OK)
         except Exception as error:
             logging.error(error)
@@ -119,19 +125,19 @@ class EDP(object):
 
         try:
             logging.info(msg.EDP_DELETE_START.format(datamodels=', '.join(datamodels)))
-            rdf = None
             datamodels = EDP.check_datamodels_parameter(datamodels, True)
-            for dataset in datamodels:
-                rdf = Serializer.serialize_rdf_remove(dataset, ConfigManager.get_dataset_id(dataset), rdf)
-                ConfigManager.remove_dataset_id(dataset)
-            Serializer.write_rdf(rdf)
+            with ConfigManager.datasets_ids_transaction():
+                Serializer.serialize_rdf_stream_remove(
+                    [(dataset, ConfigManager.get_dataset_id(dataset)) for dataset in datamodels])
+                for dataset in datamodels:
+                    ConfigManager.remove_dataset_id(dataset)
             logging.info(msg.EDP_DELETE_FINISHED_OK)
         except LastDatasetError as error:
             logging.warning(error)
-            for dataset in ConfigManager.get_integrated_datasets():
-                ConfigManager.remove_dataset_id(dataset)
-            import os
-            os.remove(Helpers.get_rdf_path())
+            with ConfigManager.datasets_ids_transaction():
+                for dataset in ConfigManager.get_integrated_datasets():
+                    ConfigManager.remove_dataset_id(dataset)
+                Serializer.remove_rdf()
             logging.info(msg.EDP_DELETE_FINISHED_OK)
         except Exception as error:
             logging.error(error)
@@ -156,6 +162,41 @@ class EDP(object):
         except Exception:
             logging.error(msg.EDP_CONFIG_FILE_GENERATION_FAILED)
 
+    @staticmethod
+    def migrate_datasets_ids(file_path, source=None):
+        """
+		Core function that copies the datasets IDs stored in an ini file into the store set in the configuration file
+		(e.g. when switching to the SQLite store). IDs already present in the store for the same Data Models are
+		replaced, and the ini file is left as it is.
+
+		:param str file_path: Path to the configuration file
+		:param str or None source: Path to the ini file with the IDs (the one inside the installed package by default)
+		:return: None
+		"""
+        try:
+            config_logging()
+            ConfigManager.set_config_path(file_path)
+            source = source or Helpers.get_datasets_ids_file_path()
+            store = ConfigManager.get_datasets_ids_instance()
+            if isinstance(store, IniDatasetsIDsStore) and os.path.realpath(store.path) == os.path.realpath(source):
+                logging.warning(msg.EDP_MIGRATE_IDS_SAME_STORE.format(source=source))
+                return
+
+            logging.info(msg.EDP_MIGRATE_IDS_START.format(source=source, path=store.path))
+            ids = IniDatasetsIDsStore(source)
+            datamodels = ids.get_datamodels()
+            with ConfigManager.datasets_ids_transaction():
+                for datamodel in datamodels:
+                    ConfigManager.save_dataset_id(datamodel, ids.get(datamodel))
+            logging.info(msg.EDP_MIGRATE_IDS_FINISHED_OK.format(ids=len(datamodels)))
+        except ValueError:
+            import click
+            click.echo(msg.EDP_ERROR_INSTANTIATING_LOGGER.format(
+                date=datetime.strftime(datetime.now(), const.SIMPLE_DATE_FORMAT), script=__name__))
+        except Exception as error:
+            logging.error(error)
+            logging.info(msg.EDP_MIGRATE_IDS_FINISHED_KO)
+
     @staticmethod
     def check_datamodels_parameter(parameter, integrated):
         """
@@ -173,12 +214,19 @@ class EDP(object):
         return list(parameter)
 
     @staticmethod
-    def get_integrated_datamodels():
+    def get_integrated_datamodels(file_path=None):
         """
 		Core function that returns the collection of Data Models (sections from config file) that are currently included
 		in the RDF/XML file.
 
+		:param str or None file_path: Path to the configuration file, which sets the datasets IDs store (if it does not
+		exist the default store is used)
 		:return: Collection of Data Models integrated
 		:rtype: list[str]
 		"""
+        if file_path:
+            try:
+                ConfigManager.set_config_path(file_path)
+            except ConfigFilePathError:
+                pass
         return ConfigManager.get_integrated_datasets()
@@ -0,0 +1,150 @@
+import threading
+import weakref
+
+import cb_edp.config.constants as const
+
+
+class RDFIndex:
+	"""
+	In-memory index over the top-level nodes of an RDF/XML tree, so nodes can be looked up by their URI without the
+	linear scans ElementTree does to evaluate XPath predicates.
+	It is built once per root node (the first time it is asked for) and it must be kept up to date through add() and
+	remove() every time a top-level node is appended to or removed from the root.
+
+	:param dict[str, list[ET.Element]] nodes: Top-level nodes by their rdf:about URI (in document order)
+	:param dict[ET.Element, list[str]] distributions: URIs of the distributions of every dataset node
+	:param dict[str, int] publishers: Number of dataset nodes referencing each publisher URI
+	"""
+	__indexes = weakref.WeakKeyDictionary()
+	__lock = threading.Lock()
+
+	def __init__(self, rdf, namespaces):
+		"""
+		Initializes RDFIndex indexing every top-level node of an RDF/XML tree.
+
+		:param ET.Element rdf: Root node of the RDF/XML tree
+		:param dict[str] namespaces: Namespaces used by the RDF/XML tree
+		"""
+		self.namespaces = namespaces
+		self.nodes = {}
+		self.distributions = {}
+		self.publishers = {}
+		self._about = RDFIndex._transform_name(const.RDF_ATTRIBUTE_ABOUT, namespaces)
+		self._resource = RDFIndex._transform_name(const.RDF_ATTRIBUTE_RESOURCE, namespaces)
+		self._dataset_tag = RDFIndex._transform_name(const.RDF_DATASET, namespaces)
+		for node in rdf:
+			self.add(node)
+
+	@classmethod
+	def get(cls, rdf, namespaces):
+		"""
+		Returns the index of an RDF/XML tree, building it if it does not exist yet.
+
+		:param ET.Element rdf: Root node of the RDF/XML tree
+		:param dict[str] namespaces: Namespaces used by the RDF/XML tree
+		:return: Index of the tree
+		:rtype: RDFIndex
+		"""
+		with cls.__lock:
+			index = cls.__indexes.get(rdf)
+			if index is None:
+				index = cls(rdf, namespaces)
+				cls.__indexes[rdf] = index
+			return index
+
+	def add(self, node):
+		"""
+		Registers a node appended to the root of the tree.
+
+		:param ET.Element node: Top-level node appended
+		:return: None
+		"""
+		self.nodes.setdefault(node.get(self._about), []).append(node)
+		if node.tag == self._dataset_tag:
+			self.distributions[node] = [distribution.get(self._resource) for distribution in
+										node.findall(const.RDF_DATASET_RESOURCE, namespaces=self.namespaces)]
+			publisher_uri = self.get_publisher(node)
+			self.publishers[publisher_uri] = self.publishers.get(publisher_uri, 0) + 1
+
+	def remove(self, node):
+		"""
+		Unregisters a node removed from the root of the tree.
+
+		:param ET.Element node: Top-level node removed
+		:return: None
+		"""
+		uri = node.get(self._about)
+		nodes = self.nodes.get(uri, [])
+		if node in nodes:
+			nodes.remove(node)
+			if not nodes:
+				del self.nodes[uri]
+		if self.distributions.pop(node, None) is not None:
+			publisher_uri = self.get_publisher(node)
+			self.publishers[publisher_uri] -= 1
+			if not self.publishers[publisher_uri]:
+				del self.publishers[publisher_uri]
+
+	def find(self, uri, tag=None):
+		"""
+		Returns the first top-level node with a given URI.
+
+		:param str uri: rdf:about URI of the node
+		:param str or None tag: Tag (in namespace:tag format) the node must have
+		:return: Node found or None if there is no node with that URI
+		:rtype: ET.Element or None
+		"""
+		tag = RDFIndex._transform_name(tag, self.namespaces) if tag else None
+		for node in self.nodes.get(uri, []):
+			if tag is None or node.tag == tag:
+				return node
+		return None
+
+	def get_distributions(self, dataset):
+		"""
+		Returns the distribution nodes referenced by a dataset node.
+
+		:param ET.Element dataset: Dataset node
+		:return: Distribution nodes present in the tree
+		:rtype: list[ET.Element]
+		"""
+		distributions = []
+		for uri in self.distributions.get(dataset, []):
+			distribution = self.find(uri, const.RDF_RESOURCE)
+			if distribution is not None:
+				distributions.append(distribution)
+		return distributions
+
+	def get_publisher(self, dataset):
+		"""
+		Returns the URI of the publisher of a dataset node.
+
+		:param ET.Element dataset: Dataset node
+		:return: Publisher URI or None if the dataset has no publisher
+		:rtype: str or None
+		"""
+		publisher = dataset.find(const.RDF_PUBLISHER, namespaces=self.namespaces)
+		return publisher.get(self._resource) if publisher is not None else None
+
+	def count_publisher_references(self, publisher_uri):
+		"""
+		Counts how many dataset nodes reference a publisher.
+
+		:param str publisher_uri: URI of the publisher
+		:return: Number of dataset nodes referencing the publisher
+		:rtype: int
+		"""
+		return self.publishers.get(publisher_uri, 0)
+
+	@staticmethod
+	def _transform_name(name, namespaces):
+		"""
+		Transforms a tag or attribute name to the format used by ElementTree library.
+
+		:param str name: Name in namespace:name format
+		:param dict[str] namespaces: Namespaces used by the RDF/XML tree
+		:return: Name in {namespace-uri}name format
+		:rtype: str
+		"""
+		prefix, suffix = name.split(':')
+		return '{{{uri}}}{suffix}'.format(uri=namespaces[prefix], suffix=suffix)
@@ -1,13 +1,20 @@
 import copy
+import gzip
 import logging
+import os
 import re
+import shutil
+import tempfile
+import threading
 import xml.etree.ElementTree as ET
 from datetime import datetime
-from xml.dom import minidom
 
 import cb_edp.config.constants as const
 import cb_edp.config.messages as msg
+from cb_edp.core.rdf.index import RDFIndex
+from cb_edp.core.rdf.writer import RDFWriter
 from cb_edp.errors.core.rdf import DatasetNotFoundError
+from cb_edp.errors.core.rdf import LastDatasetError
 from cb_edp.errors.core.rdf import RDFFileNotFoundError
 from cb_edp.errors.core.rdf import RDFParserError
 from cb_edp.errors.core.rdf import WritingRDFError
@@ -17,6 +24,11 @@ from cb_edp.models.resource import Resource
 from cb_edp.utils.helpers import Helpers
 from cb_edp.utils.validators import Validators
 
+try:
+	import brotli
+except ImportError:
+	brotli = None
+
 
 class Serializer:
 	"""
@@ -24,9 +36,15 @@ class Serializer:
 	This transformation is done having DCAT-AP 1.1 version in mind. The metadata present in result file will be, at
 	best, like the already defined in template.xml file.
 
+	The template is parsed only once per process: its root node (without children) and a prototype of every node type
+	are kept in memory and deep copies of them are handed out when building or updating an RDF/XML file.
+
 	:param dict[str] namespaces: Namespaces needed for the building of the RDF/XML file
 	"""
 	namespaces = {}
+	__template = None
+	__prototypes = {}
+	__template_lock = threading.Lock()
 
 	@staticmethod
 	def serialize_rdf_create(catalogue):
@@ -38,8 +56,8 @@ class Serializer:
 		:rtype: ET.ElementTree
 		"""
 		logging.info(msg.SERIALIZER_RDF_CREATION_START)
-		tree = Serializer._load_tree(Helpers.get_rdf_template_path())
-		rdf = tree.getroot()
+		rdf = copy.deepcopy(Serializer._load_template())
+		tree = ET.ElementTree(rdf)
 
 		Serializer.serialize_catalogue(rdf, catalogue)
 
@@ -65,8 +83,6 @@ class Serializer:
 			Serializer.serialize_publishers(rdf, publisher[0], publisher[1], publisher[2], publisher[3])
 		logging.info(msg.SERIALIZER_PUBLISHERS_SERIALIZE_FINISHED)
 
-		Serializer._remove_template_nodes(rdf)
-
 		logging.info(msg.SERIALIZER_RDF_CREATION_FINISHED)
 		return tree
 
@@ -80,33 +96,65 @@ class Serializer:
 		:return: Tree representing the updated RDF/XML file
 		:rtype: ET.ElementTree
 		"""
-		logging.info(msg.SERIALIZER_RDF_UPDATE_START.format(dataset=dataset.section))
+		return Serializer.serialize_rdf_batch_update([dataset], rdf_local_tree)
 
+	@staticmethod
+	def serialize_rdf_batch_update(datasets, rdf_local_tree=None):
+		"""
+		Updates the serialized RDF adding several new datasets (and their resources) into a new RDF/XML file.
+		Nodes are looked up through the index of the local tree, so every dataset is replaced or inserted without
+		searching the whole tree again, and the nodes of the replaced datasets are all removed at the end in a single
+		pass. The result is the same as updating the datasets one by one.
+
+		:param list[Dataset] datasets: Dataset model instances
+		:param ET.ElementTree rdf_local_tree: Tree representing locally stored serialized RDF/XML
+		:return: Tree representing the updated RDF/XML file
+		:rtype: ET.ElementTree
+		"""
 		if not rdf_local_tree:
 			rdf_local_tree = Serializer._load_tree(Helpers.get_rdf_path())
 		rdf_local_root = rdf_local_tree.getroot()
+		if not datasets:
+			return rdf_local_tree
 
-		rdf_template = Serializer._load_tree(Helpers.get_rdf_template_path()).getroot()
-
-		Serializer._update_dataset_node(rdf_template, rdf_local_root, dataset)
-
-		Serializer._update_catalogue_date(rdf_local_root, rdf_template)
-		Serializer._remove_template_nodes(rdf_template)
-
-		for descendant in rdf_template.findall('*'):
-			rdf_local_root.append(descendant)
-
+		index = Serializer._get_index(rdf_local_root)
 		catalogue_rdf = rdf_local_root.find(const.RDF_CATALOGUE, namespaces=Serializer.namespaces)
-		xpath = const.RDF_ATTRIBUTE_XPATH.format(element=const.RDF_CATALOGUE_DATASET,
-												 attribute=const.RDF_ATTRIBUTE_RESOURCE, value=dataset.uri)
-		if catalogue_rdf.find(xpath, namespaces=Serializer.namespaces) is None:
-			logging.info(msg.SERIALIZER_RDF_UPDATE_NEW_DATASET.format(dataset=dataset.section))
-			Serializer._set_value(catalogue_rdf, const.RDF_CATALOGUE_DATASET, dataset.uri,
-								  attribute=const.RDF_ATTRIBUTE_RESOURCE, duplicate=True)
-		else:
-			Serializer._remove_dataset_node(dataset.section, rdf_local_root, dataset.id, False, updating=True)
-
-		logging.info(msg.SERIALIZER_RDF_UPDATE_FINISHED.format(dataset=dataset.section))
+		catalogue_datasets = {node.get(Serializer._transform_attribute(const.RDF_ATTRIBUTE_RESOURCE)) for node in
+							  catalogue_rdf.findall(const.RDF_CATALOGUE_DATASET, namespaces=Serializer.namespaces)}
+		Serializer._update_catalogue_date(rdf_local_root)
+
+		removed_nodes = []
+		for dataset in datasets:
+			logging.info(msg.SERIALIZER_RDF_UPDATE_START.format(dataset=dataset.section))
+			logging.debug(msg.SERIALIZER_UPDATE_DATASET_NODE.format(datamodel=dataset.section))
+
+			old_dataset_rdf = index.find(dataset.uri, const.RDF_DATASET)
+			new_publisher = not index.count_publisher_references(dataset.publisher_uri)
+			Serializer.serialize_dataset(rdf_local_root, dataset, updated=True)
+			for resource in dataset.resources:
+				Serializer.serialize_resource(rdf_local_root, resource)
+			if new_publisher:
+				Serializer.serialize_publishers(rdf_local_root, dataset.publisher_uri, dataset.publisher_name,
+												dataset.publisher_type, dataset.publisher_homepage)
+
+			if dataset.uri not in catalogue_datasets:
+				logging.info(msg.SERIALIZER_RDF_UPDATE_NEW_DATASET.format(dataset=dataset.section))
+				Serializer._set_value(catalogue_rdf, const.RDF_CATALOGUE_DATASET, dataset.uri,
+									  attribute=const.RDF_ATTRIBUTE_RESOURCE, duplicate=True)
+				catalogue_datasets.add(dataset.uri)
+			else:
+				logging.debug(msg.SERIALIZER_REMOVE_DATASET_NODE.format(datamodel=dataset.section))
+				if old_dataset_rdf is None:
+					logging.debug(msg.SERIALIZER_REMOVE_DATASET_NODE_NOT_PRESENT)
+				else:
+					old_nodes = Serializer._get_dataset_nodes(index, old_dataset_rdf)
+					for node in old_nodes:
+						index.remove(node)
+					removed_nodes.extend(old_nodes)
+
+			logging.info(msg.SERIALIZER_RDF_UPDATE_FINISHED.format(dataset=dataset.section))
+
+		Serializer._remove_nodes(rdf_local_root, removed_nodes, indexed=True)
 		return rdf_local_tree
 
 	@staticmethod
@@ -128,12 +176,102 @@ class Serializer:
 
 		Serializer._remove_dataset_node(dataset_section, local_rdf_root, dataset_uri, remove_from_catalogue=True)
 
-		rdf_template = Serializer._load_tree(Helpers.get_rdf_template_path()).getroot()
-		Serializer._update_catalogue_date(local_rdf_root, rdf_template)
+		Serializer._update_catalogue_date(local_rdf_root)
 
 		logging.info(msg.SERIALIZER_RDF_REMOVE_FINISHED.format(dataset=dataset_section))
 		return rdf_local_tree
 
+	@staticmethod
+	def serialize_rdf_stream_remove(datasets):
+		"""
+		Removes several datasets (and their resources and orphaned publishers) from the RDF/XML file without loading it
+		entirely in memory, writing the new version of the file.
+		The file is read twice node by node: first to find out which nodes must be removed and then to copy the rest
+		of them to the new file (only the first node with each URI is removed, as when removing datasets from a tree).
+		Only one top-level node is kept in memory at a time (text between top-level nodes is expected to be whitespace,
+		as in the files written by write_rdf()).
+
+		:param list[(str, str)] datasets: Config file section and identifier of each dataset to remove
+		:return: None
+		:raises DatasetNotFoundError:
+		:raises LastDatasetError:
+		:raises WritingRDFError:
+		"""
+		logging.info(msg.SERIALIZER_RDF_STREAM_REMOVE_START.format(
+			datasets=', '.join([dataset_section for dataset_section, _ in datasets])))
+
+		path = Helpers.get_rdf_path()
+		Serializer._load_template()
+		Validators.is_file_at_path(path)
+		uris = {Serializer._get_dataset_uri(dataset_id): dataset_section for dataset_section, dataset_id in datasets}
+
+		about = Serializer._transform_attribute(const.RDF_ATTRIBUTE_ABOUT)
+		resource = Serializer._transform_attribute(const.RDF_ATTRIBUTE_RESOURCE)
+		dataset_tag = Serializer._transform_attribute(const.RDF_DATASET)
+		resource_tag = Serializer._transform_attribute(const.RDF_RESOURCE)
+		organization_tag = Serializer._transform_attribute(const.RDF_ORGANIZATION)
+		catalogue_tag = Serializer._transform_attribute(const.RDF_CATALOGUE)
+
+		datasets_found = set()
+		datasets_count = 0
+		distributions = set()
+		publishers = {}
+		removed_publishers = set()
+		for _, node in Serializer._iterate_nodes(path):
+			if node.tag != dataset_tag:
+				continue
+			datasets_count += 1
+			publisher = node.find(const.RDF_PUBLISHER, namespaces=Serializer.namespaces)
+			publisher_uri = publisher.get(resource) if publisher is not None else None
+			publishers[publisher_uri] = publishers.get(publisher_uri, 0) + 1
+			if node.get(about) in uris:
+				datasets_found.add(node.get(about))
+				removed_publishers.add(publisher_uri)
+				publishers[publisher_uri] -= 1
+				for distribution in node.findall(const.RDF_DATASET_RESOURCE, namespaces=Serializer.namespaces):
+					distributions.add(distribution.get(resource))
+
+		for uri, dataset_section in uris.items():
+			if uri not in datasets_found:
+				raise DatasetNotFoundError(dataset_section)
+		if len(datasets_found) == datasets_count:
+			raise LastDatasetError
+		organizations = {publisher_uri for publisher_uri in removed_publishers if not publishers[publisher_uri]}
+
+		removed_nodes = {dataset_tag: set(uris), resource_tag: distributions, organization_tag: organizations}
+		try:
+			with tempfile.TemporaryDirectory() as folder:
+				body_path = os.path.join(folder, const.RDF_FILE_NAME)
+				with open(body_path, 'w', encoding='utf8') as body_file:
+					writer = RDFWriter(body_file, Serializer.namespaces)
+					root = None
+					for root, node in Serializer._iterate_nodes(path):
+						uri = node.get(about)
+						if uri in removed_nodes.get(node.tag, ()):
+							logging.debug(msg.SERIALIZER_RDF_STREAM_REMOVE_NODE.format(uri=uri))
+							removed_nodes[node.tag].discard(uri)
+							continue
+						if node.tag == catalogue_tag:
+							Serializer._remove_catalogue_datasets(node, uris)
+							Serializer._set_catalogue_date(node)
+						writer.write_element(node, '\t')
+				namespaces = writer.get_written_namespaces()
+				namespaces.update(writer.get_namespaces(root))
+
+				with open(body_path, 'rb') as body_file:
+					with Helpers.open_atomically(path, const.RDF_FILE_MODE, mode='w') as file:
+						writer.file = file
+						writer.start_document(root, namespaces)
+						file.flush()
+						shutil.copyfileobj(body_file, file.buffer, const.RDF_WRITER_BUFFER_SIZE)
+						writer.end_document(root)
+						file.flush()
+						Serializer._write_compressed_rdf(file.name)
+		except:
+			raise WritingRDFError(path)
+
+		logging.info(msg.SERIALIZER_RDF_STREAM_REMOVE_FINISHED)
+
 	@staticmethod
 	def serialize_catalogue(rdf, catalogue):
 		"""
@@ -146,7 +284,7 @@ class Serializer:
 		"""
 		logging.info(msg.SERIALIZER_CATALOGUE_SERIALIZE_START.format(datamodels=', '.join(catalogue.sections)))
 
-		catalogue_rdf = Serializer._clone_node(rdf, const.RDF_CATALOGUE)
+		catalogue_rdf = Serializer._clone_prototype(const.RDF_CATALOGUE)
 
 		Serializer._set_node_attribute(catalogue_rdf, const.RDF_ATTRIBUTE_ABOUT, catalogue.uri)
 		Serializer._set_value(catalogue_rdf, const.RDF_TITLE, catalogue.title)
@@ -160,7 +298,7 @@ class Serializer:
 		Serializer._set_multiple_values(catalogue_rdf, const.RDF_CATALOGUE_DATASET, uris,
 										attribute=const.RDF_ATTRIBUTE_RESOURCE)
 
-		rdf.append(catalogue_rdf)
+		Serializer._append_node(rdf, catalogue_rdf)
 
 		logging.debug(msg.SERIALIZER_CATALOGUE_SERIALIZE_FINISHED)
 		return catalogue_rdf
@@ -177,7 +315,7 @@ class Serializer:
 		:rtype: ET.Element
 		"""
 		logging.info(msg.SERIALIZER_DATASET_SERIALIZE_START.format(datamodel=dataset.section))
-		dataset_rdf = Serializer._clone_node(rdf, const.RDF_DATASET)
+		dataset_rdf = Serializer._clone_prototype(const.RDF_DATASET)
 
 		Serializer._set_node_attribute(dataset_rdf, const.RDF_ATTRIBUTE_ABOUT, dataset.uri)
 		Serializer._set_value(dataset_rdf, const.RDF_TITLE, dataset.title)
@@ -217,7 +355,7 @@ class Serializer:
 		Serializer._set_multiple_values(dataset_rdf, const.RDF_DATASET_RESOURCE, uris,
 										attribute=const.RDF_ATTRIBUTE_RESOURCE)
 
-		rdf.append(dataset_rdf)
+		Serializer._append_node(rdf, dataset_rdf)
 
 		logging.debug(msg.SERIALIZER_DATASET_SERIALIZE_FINISHED.format(datamodel=dataset.section))
 		return dataset_rdf
@@ -234,7 +372,7 @@ class Serializer:
 		"""
 		logging.debug(msg.SERIALIZER_RESOURCE_SERIALIZE_START)
 
-		resource_rdf = Serializer._clone_node(rdf, const.RDF_RESOURCE)
+		resource_rdf = Serializer._clone_prototype(const.RDF_RESOURCE)
 		Serializer._set_node_attribute(resource_rdf, const.RDF_ATTRIBUTE_ABOUT, resource.uri)
 		Serializer._set_value(resource_rdf, const.RDF_ACCESS_URL, resource.url, attribute=const.RDF_ATTRIBUTE_RESOURCE)
 		Serializer._set_value(resource_rdf, const.RDF_DESCRIPTION, resource.description)
@@ -244,7 +382,7 @@ class Serializer:
 		Serializer._set_value(resource_rdf, const.RDF_LICENSE, resource.license, attribute=const.RDF_ATTRIBUTE_RESOURCE,
 							  remove=True)
 
-		rdf.append(resource_rdf)
+		Serializer._append_node(rdf, resource_rdf)
 
 		logging.debug(msg.SERIALIZER_RESOURCE_SERIALIZE_FINISHED)
 		return resource_rdf
@@ -264,7 +402,7 @@ class Serializer:
 		"""
 		logging.debug(msg.SERIALIZER_PUBLISHER_SERIALIZE_START.format(name=publisher_name))
 
-		publisher_rdf = Serializer._clone_node(rdf, const.RDF_ORGANIZATION)
+		publisher_rdf = Serializer._clone_prototype(const.RDF_ORGANIZATION)
 		Serializer._set_node_attribute(publisher_rdf, const.RDF_ATTRIBUTE_ABOUT, publisher_uri)
 		Serializer._set_value(publisher_rdf, const.RDF_ORGANIZATION_NAME, publisher_name)
 		Serializer._set_value(publisher_rdf, const.RDF_TYPE, publisher_type, attribute=const.RDF_ATTRIBUTE_RESOURCE,
@@ -272,7 +410,7 @@ class Serializer:
 		Serializer._set_value(publisher_rdf, const.RDF_HOMEPAGE, publisher_homepage,
 							  attribute=const.RDF_ATTRIBUTE_RESOURCE, remove=True)
 
-		rdf.append(publisher_rdf)
+		Serializer._append_node(rdf, publisher_rdf)
 
 		logging.debug(msg.SERIALIZER_PUBLISHER_SERIALIZE_FINISHED.format(name=publisher_name))
 		return publisher_rdf
@@ -281,19 +419,57 @@ class Serializer:
 	def write_rdf(rdf):
 		"""
 		Writes the RDF into a file locally based on constants.
+		The tree is pretty-printed while it is written, so no string or DOM holding the whole document is built.
+		It is written to a temporary file that replaces the current one only once complete (after its compressed
+		versions), so the API never serves a truncated catalogue and a failed write keeps the previous one.
 
 		:param ET.ElementTree rdf: Tree containing RDF catalogue
 		:return: None
 		:raises WritingRDFError:
 		"""
-		root_str = ET.tostring(rdf.getroot()).decode('utf8')
-		root_str = re.sub('(>|&gt;)(\t|\n|\r|\s)*(<|&lt;)', '\g<1>\g<3>', root_str)
-		rdf_str = minidom.parseString(root_str).toprettyxml(indent='\t', encoding='utf-8')
+		path = Helpers.get_rdf_path()
 		try:
-			with open(Helpers.get_rdf_path(), 'w+') as file:
-				file.write(rdf_str.decode('utf8'))
+			with Helpers.open_atomically(path, const.RDF_FILE_MODE, mode='w') as file:
+				RDFWriter(file, Serializer.namespaces).write(rdf.getroot())
+				file.flush()
+				Serializer._write_compressed_rdf(file.name)
 		except:
-			raise WritingRDFError(Helpers.get_rdf_path())
+			raise WritingRDFError(path)
+
+	@staticmethod
+	def remove_rdf():
+		"""
+		Removes the RDF file and its compressed versions from the filesystem.
+
+		:return: None
+		"""
+		for path in [Helpers.get_rdf_path()] + list(Helpers.get_compressed_rdf_paths().values()):
+			if os.path.exists(path):
+				os.remove(path)
+
+	@staticmethod
+	def _write_compressed_rdf(rdf_path):
+		"""
+		Writes next to the RDF file its compressed versions, so the API can serve them without compressing on request.
+		Gzip version is always written and Brotli one only if brotli module is installed. The RDF file is read in
+		chunks, so it is never entirely loaded in memory.
+
+		:param str rdf_path: Path of the RDF file (or of the temporary file it is being written to)
+		:return: None
+		"""
+		for encoding, path in Helpers.get_compressed_rdf_paths().items():
+			if encoding == const.RDF_FILE_ENCODING_GZIP:
+				with open(rdf_path, 'rb') as rdf_file, Helpers.open_atomically(path, const.RDF_FILE_MODE) as file:
+					with gzip.GzipFile(filename='', mode='wb', fileobj=file, compresslevel=9, mtime=0) as gzip_file:
+						shutil.copyfileobj(rdf_file, gzip_file, const.RDF_WRITER_BUFFER_SIZE)
+			elif brotli is not None:
+				with open(rdf_path, 'rb') as rdf_file, Helpers.open_atomically(path, const.RDF_FILE_MODE) as file:
+					compressor = brotli.Compressor()
+					for chunk in iter(lambda: rdf_file.read(const.RDF_WRITER_BUFFER_SIZE), b''):
+						file.write(compressor.process(chunk))
+					file.write(compressor.finish())
+			elif os.path.exists(path):
+				os.remove(path)
 
 	@staticmethod
 	def _set_value(parent, node_name, value, attribute=None, duplicate=False, remove=False):
@@ -389,6 +565,18 @@ class Serializer:
 		node = parent.find(name, namespaces=Serializer.namespaces)
 		return copy.deepcopy(node)
 
+	@staticmethod
+	def _clone_prototype(name):
+		"""
+		Makes a copy of the pristine template node of a type.
+
+		:param str name: Name of the node type (Catalog, Dataset, Distribution or Organization)
+		:return: Copy of the template node
+		:rtype: ET.Element
+		"""
+		Serializer._load_template()
+		return copy.deepcopy(Serializer.__prototypes[name])
+
 	@staticmethod
 	def _transform_attribute(attribute):
 		"""
@@ -413,9 +601,8 @@ class Serializer:
 		"""
 		logging.debug(msg.SERIALIZER_LOAD_TREE.format(path=xml_path))
 
+		Serializer._load_template()
 		Validators.is_file_at_path(xml_path)
-		Serializer.namespaces = Serializer._get_rdf_namespaces(xml_path)
-		Serializer._register_namespaces(Serializer.namespaces)
 		try:
 			return ET.parse(xml_path)
 		except ET.ParseError:
@@ -424,24 +611,35 @@ class Serializer:
 			raise RDFFileNotFoundError(xml_path)
 
 	@staticmethod
-	def _update_dataset_node(rdf_template, rdf_local, dataset):
+	def _load_template():
 		"""
-		Adds a new dataset and every child depending on it.
+		Parses the RDF template the first time it is needed in the process, getting its namespaces and splitting it in
+		its root node and the prototypes of the nodes it contains.
 
-		:param ET.Element rdf_template: Root node of RDF template file
-		:param ET.Element rdf_local: Root node of RDF local file
-		:param Dataset dataset: Dataset to add to the RDF
-		:return: None
+		:return: Root node of the template without children
+		:rtype: ET.Element
 		"""
-		logging.debug(msg.SERIALIZER_UPDATE_DATASET_NODE.format(datamodel=dataset.section))
-
-		Serializer.serialize_dataset(rdf_template, dataset, updated=True)
-		for resource in dataset.resources:
-			Serializer.serialize_resource(rdf_template, resource)
-
-		if not Serializer._dataset_publisher_node_appearances(rdf_local, dataset.publisher_uri):
-			Serializer.serialize_publishers(rdf_template, dataset.publisher_uri, dataset.publisher_name,
-											dataset.publisher_type, dataset.publisher_homepage)
+		with Serializer.__template_lock:
+			if Serializer.__template is None:
+				template_path = Helpers.get_rdf_template_path()
+				logging.debug(msg.SERIALIZER_LOAD_TREE.format(path=template_path))
+
+				Validators.is_file_at_path(template_path)
+				Serializer.namespaces = Serializer._get_rdf_namespaces(template_path)
+				Serializer._register_namespaces(Serializer.namespaces)
+				try:
+					template = ET.parse(template_path).getroot()
+				except ET.ParseError:
+					raise RDFParserError(template_path)
+
+				prototypes = {}
+				for name in const.RDF_TEMPLATE_NODES:
+					node = template.find(name, namespaces=Serializer.namespaces)
+					template.remove(node)
+					prototypes[name] = node
+				Serializer.__prototypes = prototypes
+				Serializer.__template = template
+			return Serializer.__template
 
 	@staticmethod
 	def _remove_dataset_node(datamodel, rdf, uuid, remove_from_catalogue, updating=False):
@@ -458,15 +656,9 @@ class Serializer:
 		"""
 		logging.debug(msg.SERIALIZER_REMOVE_DATASET_NODE.format(datamodel=datamodel))
 
-		from cb_edp.config.constants import Model
-		from cb_edp.config.manager import ConfigManager
-		uri_host = ConfigManager.get_value(const.MAIN_SECTION, const.URI_HOST)
-		uri_structure = ConfigManager.get_value(const.MAIN_SECTION, const.URI_STRUCTURE, const.URI_STRUCTURE_DEFAULT)
-		uri = Helpers.generate_uri(uri_host, uri_structure, Model.DATASET, uuid)[0]
-
-		dataset = rdf.find(
-			const.RDF_ATTRIBUTE_XPATH.format(element=const.RDF_DATASET, attribute=const.RDF_ATTRIBUTE_ABOUT, value=uri),
-			namespaces=Serializer.namespaces)
+		uri = Serializer._get_dataset_uri(uuid)
+		index = Serializer._get_index(rdf)
+		dataset = index.find(uri, const.RDF_DATASET)
 		if dataset is None:
 			if updating:
 				logging.debug(msg.SERIALIZER_REMOVE_DATASET_NODE_NOT_PRESENT)
@@ -476,25 +668,7 @@ class Serializer:
 
 		Validators.is_last_dataset(rdf, Serializer.namespaces, const.RDF_DATASET)
 
-		dataset_resources = dataset.findall(const.RDF_DATASET_RESOURCE, namespaces=Serializer.namespaces)
-		for dataset_resource in dataset_resources:
-			attribute = dataset_resource.attrib[Serializer._transform_attribute(const.RDF_ATTRIBUTE_RESOURCE)]
-			resource = rdf.find(
-				const.RDF_ATTRIBUTE_XPATH.format(element=const.RDF_RESOURCE, attribute=const.RDF_ATTRIBUTE_ABOUT,
-												 value=attribute), namespaces=Serializer.namespaces)
-			rdf.remove(resource)
-
-		publisher = dataset.find(const.RDF_PUBLISHER, namespaces=Serializer.namespaces)
-		publisher_uri = publisher.attrib[Serializer._transform_attribute(const.RDF_ATTRIBUTE_RESOURCE)]
-		if Serializer._dataset_publisher_node_appearances(rdf, publisher_uri) == 1:
-			publisher = dataset.find(const.RDF_PUBLISHER, namespaces=Serializer.namespaces)
-			publisher_uri = publisher.attrib[Serializer._transform_attribute(const.RDF_ATTRIBUTE_RESOURCE)]
-			organization = rdf.find(
-				const.RDF_ATTRIBUTE_XPATH.format(element=const.RDF_ORGANIZATION, attribute=const.RDF_ATTRIBUTE_ABOUT,
-												 value=publisher_uri), namespaces=Serializer.namespaces)
-			rdf.remove(organization)
-
-		rdf.remove(dataset)
+		Serializer._remove_nodes(rdf, Serializer._get_dataset_nodes(index, dataset))
 
 		if remove_from_catalogue:
 			catalogue = rdf.find(const.RDF_CATALOGUE, Serializer.namespaces)
@@ -504,18 +678,23 @@ class Serializer:
 			catalogue.remove(dataset)
 
 	@staticmethod
-	def _update_catalogue_date(rdf, rdf_template):
+	def _update_catalogue_date(rdf):
 		"""
 		Updates the modified date of the catalogue to the current one.
 
 		:param ET.Element rdf: Root node of already generated RDF file
-		:param ET.Element rdf_template: Root node of RDF template file
 		:return: None
 		"""
-		catalogue = rdf_template.find(const.RDF_CATALOGUE, namespaces=Serializer.namespaces)
-		template_modified_node = Serializer._clone_node(catalogue, const.RDF_MODIFIED)
+		Serializer._set_catalogue_date(rdf.find(const.RDF_CATALOGUE, namespaces=Serializer.namespaces))
 
-		catalogue = rdf.find(const.RDF_CATALOGUE, namespaces=Serializer.namespaces)
+	@staticmethod
+	def _set_catalogue_date(catalogue):
+		"""
+		Sets the modified date of a catalogue node to the current one, creating the node from the template if missing.
+
+		:param ET.Element catalogue: Catalogue node of already generated RDF file
+		:return: None
+		"""
 		local_modified_node = catalogue.find(const.RDF_MODIFIED, namespaces=Serializer.namespaces)
 		date = Helpers.format_datetime(datetime.utcnow())
 		if local_modified_node is not None:
@@ -523,41 +702,146 @@ class Serializer:
 			Serializer._set_node_text(local_modified_node, date)
 		else:
 			logging.debug(msg.SERIALIZER_CATALOGUE_DATE_ALREADY_EXISTS.format(date=date))
+			Serializer._load_template()
+			template_modified_node = Serializer._clone_node(Serializer.__prototypes[const.RDF_CATALOGUE],
+															const.RDF_MODIFIED)
 			Serializer._set_node_text(template_modified_node, date)
 			catalogue.append(template_modified_node)
 
 	@staticmethod
-	def _dataset_publisher_node_appearances(rdf, uri):
+	def _remove_catalogue_datasets(catalogue, uris):
 		"""
-		Counts how many times a publisher node from a specific dataset is referenced in entire RDF file.
+		Removes from a catalogue node its references to some datasets.
 
-		:param ET.Element rdf: Root node of already generated RDF file
-		:param str uri: URI of the publisher node
-		:return: Number of times dataset's publisher node is referenced
+		:param ET.Element catalogue: Catalogue node of already generated RDF file
+		:param collections.abc.Container[str] uris: URIs of the datasets whose references are removed
+		:return: None
+		"""
+		resource = Serializer._transform_attribute(const.RDF_ATTRIBUTE_RESOURCE)
+		removed_uris = set()
+		for node in catalogue.findall(const.RDF_CATALOGUE_DATASET, namespaces=Serializer.namespaces):
+			uri = node.get(resource)
+			if uri in uris and uri not in removed_uris:
+				catalogue.remove(node)
+				removed_uris.add(uri)
+
+	@staticmethod
+	def _get_dataset_uri(uuid):
+		"""
+		Builds the URI of a dataset from its identifier as set in the config file.
+
+		:param str uuid: Dataset's identifier
+		:return: Dataset's URI
+		:rtype: str
+		"""
+		from cb_edp.config.constants import Model
+		from cb_edp.config.manager import ConfigManager
+		uri_host = ConfigManager.get_value(const.MAIN_SECTION, const.URI_HOST)
+		uri_structure = ConfigManager.get_value(const.MAIN_SECTION, const.URI_STRUCTURE, const.URI_STRUCTURE_DEFAULT)
+		return Helpers.generate_uri(uri_host, uri_structure, Model.DATASET, uuid)[0]
+
+	@staticmethod
+	def _iterate_nodes(xml_path):
+		"""
+		Parses an XML file incrementally, yielding its top-level nodes one by one (once entirely parsed). Every node is
+		discarded after being yielded, so memory used does not depend on the size of the file.
+
+		:param str xml_path: Path to RDF/XML file
+		:return: Root node (without its previous children) and each of its children
+		:rtype: collections.abc.Iterator[(ET.Element, ET.Element)]
+		:raises RDFParserError:
+		"""
+		depth = 0
+		root = None
+		try:
+			for event, element in ET.iterparse(xml_path, events=('start', 'end')):
+				if event == 'start':
+					depth += 1
+					if depth == 1:
+						root = element
+					continue
+				depth -= 1
+				if depth == 1:
+					yield root, element
+					root.remove(element)
+		except ET.ParseError:
+			raise RDFParserError(xml_path)
+
+	@staticmethod
+	def _get_index(rdf):
 		"""
-		publisher_attribute_xpath = const.RDF_ATTRIBUTE_XPATH.format(element=const.RDF_PUBLISHER,
-																	 attribute=const.RDF_ATTRIBUTE_RESOURCE, value=uri)
-		publisher_parent_xpath = const.RDF_ELEMENT_XPATH.format(element=const.RDF_DATASET)
+		Returns the URI index of an RDF/XML tree (built the first time it is needed).
 
-		publishers_xpath = '{element}/{attribute}'.format(element=publisher_parent_xpath,
-														  attribute=publisher_attribute_xpath)
-		publisher_nodes = rdf.findall(publishers_xpath, namespaces=Serializer.namespaces)
+		:param ET.Element rdf: Root node of the RDF/XML tree
+		:return: Index of the tree
+		:rtype: RDFIndex
+		"""
+		return RDFIndex.get(rdf, Serializer.namespaces)
 
-		logging.debug(msg.SERIALIZER_PUBLISHER_NODE_APPEARANCES.format(times=len(publisher_nodes)))
-		return len(publisher_nodes)
+	@staticmethod
+	def _append_node(rdf, node):
+		"""
+		Appends a node to the root of an RDF/XML tree, registering it in the index of the tree.
+
+		:param ET.Element rdf: Root node of the RDF/XML tree
+		:param ET.Element node: Node to append
+		:return: None
+		"""
+		rdf.append(node)
+		Serializer._get_index(rdf).add(node)
 
 	@staticmethod
-	def _remove_template_nodes(rdf):
+	def _remove_nodes(rdf, nodes, indexed=False):
 		"""
-		Removes from the RDF supplied template's original nodes.
+		Removes several nodes from the root of an RDF/XML tree in a single pass over its children, unregistering them
+		from the index of the tree.
 
-		:param ET.Element rdf: Informed template RDF
+		:param ET.Element rdf: Root node of the RDF/XML tree
+		:param list[ET.Element] nodes: Nodes to remove
+		:param bool indexed: If the nodes were already unregistered from the index
 		:return: None
 		"""
-		Serializer._remove_node(rdf, const.RDF_CATALOGUE)
-		Serializer._remove_node(rdf, const.RDF_DATASET)
-		Serializer._remove_node(rdf, const.RDF_RESOURCE)
-		Serializer._remove_node(rdf, const.RDF_ORGANIZATION)
+		if not nodes:
+			return
+		if not indexed:
+			index = Serializer._get_index(rdf)
+			for node in nodes:
+				index.remove(node)
+		nodes = set(nodes)
+		rdf[:] = [node for node in rdf if node not in nodes]
+
+	@staticmethod
+	def _get_dataset_nodes(index, dataset):
+		"""
+		Obtains a dataset node and the nodes only referenced by it: its distributions and its publisher (if no other
+		dataset references it).
+
+		:param RDFIndex index: Index of the RDF/XML tree
+		:param ET.Element dataset: Dataset node
+		:return: Nodes that must be removed along with the dataset
+		:rtype: list[ET.Element]
+		"""
+		nodes = index.get_distributions(dataset)
+		publisher_uri = index.get_publisher(dataset)
+		if Serializer._dataset_publisher_node_appearances(index, publisher_uri) == 1:
+			organization = index.find(publisher_uri, const.RDF_ORGANIZATION)
+			if organization is not None:
+				nodes.append(organization)
+		nodes.append(dataset)
+		return nodes
+
+	@staticmethod
+	def _dataset_publisher_node_appearances(index, uri):
+		"""
+		Counts how many times a publisher node from a specific dataset is referenced in entire RDF file.
+
+		:param RDFIndex index: Index of already generated RDF file
+		:param str uri: URI of the publisher node
+		:return: Number of times dataset's publisher node is referenced
+		"""
+		appearances = index.count_publisher_references(uri)
+		logging.debug(msg.SERIALIZER_PUBLISHER_NODE_APPEARANCES.format(times=appearances))
+		return appearances
 
 	@staticmethod
 	def _register_namespaces(namespaces):
@@ -0,0 +1,228 @@
+import re
+
+import cb_edp.config.constants as const
+
+
+class RDFWriter:
+	"""
+	Pretty-printer that writes an RDF/XML tree element by element straight into a text file.
+	Its output is the same that Python's minidom toprettyxml() method returns (tab indented and UTF-8 declared) for the
+	tree serialized by ElementTree once the whitespace between tags has been stripped, but without building any
+	intermediate string or DOM for the whole document.
+
+	:param io.TextIOBase file: Text file where the RDF/XML is written
+	:param dict[str, str] namespaces: Namespaces URIs by prefix used in the document
+	"""
+	_whitespace_regex = re.compile(const.RDF_WRITER_WHITESPACE_REGEX, re.ASCII)
+
+	def __init__(self, file, namespaces):
+		"""
+		Initializes RDFWriter.
+
+		:param io.TextIOBase file: Text file where the RDF/XML is written
+		:param dict[str, str] namespaces: Namespaces URIs by prefix used in the document
+		"""
+		self.file = file
+		self.prefixes = {uri: prefix for prefix, uri in namespaces.items()}
+		self._qnames = {}
+
+	def write(self, root):
+		"""
+		Writes an entire RDF/XML document.
+
+		:param xml.etree.ElementTree.Element root: Root node of the document
+		:return: None
+		"""
+		self.file.write(const.RDF_WRITER_DECLARATION)
+		self.write_element(root, '', self.get_namespaces(root))
+
+	def start_document(self, root, namespaces):
+		"""
+		Writes the XML declaration and the start tag of the root node of a document whose children will be written one
+		by one later using write_element().
+
+		:param xml.etree.ElementTree.Element root: Root node of the document (its children are ignored)
+		:param dict[str, str] namespaces: Namespaces URIs to declare in root node by prefix
+		:return: None
+		"""
+		self.file.write(const.RDF_WRITER_DECLARATION)
+		self.file.write('<' + self._get_qname(root.tag))
+		self._write_attributes(root, namespaces)
+		self.file.write('>\n')
+
+	def end_document(self, root):
+		"""
+		Writes the end tag of the root node of a document started with start_document().
+
+		:param xml.etree.ElementTree.Element root: Root node of the document
+		:return: None
+		"""
+		self.file.write('</{tag}>\n'.format(tag=self._get_qname(root.tag)))
+
+	def write_element(self, element, indent, namespaces=None):
+		"""
+		Writes an element and all its descendants.
+
+		:param xml.etree.ElementTree.Element element: Node to write
+		:param str indent: Indentation of the node
+		:param dict[str, str] or None namespaces: Namespaces URIs to declare in the node by prefix
+		:return: None
+		"""
+		write = self.file.write
+		tag = self._get_qname(element.tag)
+		write(indent + '<' + tag)
+		self._write_attributes(element, namespaces)
+
+		nodes = []
+		text = RDFWriter._strip_text(element.text)
+		if text:
+			nodes.append(text)
+		for child in element:
+			nodes.append(child)
+			tail = RDFWriter._strip_text(child.tail)
+			if tail:
+				nodes.append(tail)
+
+		if not nodes:
+			write('/>\n')
+		elif len(nodes) == 1 and type(nodes[0]) is str:
+			write('>' + RDFWriter._escape(nodes[0]) + '</' + tag + '>\n')
+		else:
+			write('>\n')
+			child_indent = indent + '\t'
+			for node in nodes:
+				if type(node) is str:
+					write(child_indent + RDFWriter._escape(node) + '\n')
+				else:
+					self.write_element(node, child_indent)
+			write(indent + '</' + tag + '>\n')
+
+	def _write_attributes(self, element, namespaces):
+		"""
+		Writes the namespaces declarations (sorted by prefix) and the attributes of an element.
+
+		:param xml.etree.ElementTree.Element element: Node whose attributes are written
+		:param dict[str, str] or None namespaces: Namespaces URIs to declare in the node by prefix
+		:return: None
+		"""
+		write = self.file.write
+		if namespaces:
+			for prefix in sorted(namespaces):
+				write(' xmlns:{prefix}="{uri}"'.format(prefix=prefix, uri=RDFWriter._escape(namespaces[prefix])))
+		for name, value in element.items():
+			write(' ' + self._get_qname(name) + '="' + RDFWriter._escape(RDFWriter._strip_attribute(value)) + '"')
+
+	def _get_qname(self, name):
+		"""
+		Transforms a name in {namespace-uri}name format to prefix:name format.
+
+		:param str name: Tag or attribute name as ElementTree stores it
+		:return: Qualified name
+		:rtype: str
+		"""
+		qname = self._qnames.get(name)
+		if qname is None:
+			if name[:1] == '{':
+				uri, local_name = name[1:].split('}', 1)
+				if uri not in self.prefixes:
+					self.prefixes[uri] = 'ns{number}'.format(number=len(self.prefixes))
+				qname = '{prefix}:{name}'.format(prefix=self.prefixes[uri], name=local_name)
+			else:
+				qname = name
+			self._qnames[name] = qname
+		return qname
+
+	def get_namespaces(self, root):
+		"""
+		Obtains the namespaces used by the tags and attributes of a tree, as ElementTree only declares those.
+
+		:param xml.etree.ElementTree.Element root: Root node of the tree
+		:return: Namespaces URIs by prefix
+		:rtype: dict[str, str]
+		"""
+		names = set()
+		for element in root.iter():
+			names.add(element.tag)
+			names.update(element.keys())
+
+		namespaces = {}
+		for name in names:
+			qname = self._get_qname(name)
+			if ':' in qname:
+				prefix = qname.split(':', 1)[0]
+				namespaces[prefix] = name[1:].split('}', 1)[0]
+		return namespaces
+
+	def get_written_namespaces(self):
+		"""
+		Obtains the namespaces used by the tags and attributes written so far, so the root node of a document whose
+		children have already been written elsewhere can declare them.
+
+		:return: Namespaces URIs by prefix
+		:rtype: dict[str, str]
+		"""
+		namespaces = {}
+		for name, qname in self._qnames.items():
+			if ':' in qname:
+				namespaces[qname.split(':', 1)[0]] = name[1:].split('}', 1)[0]
+		return namespaces
+
+	@staticmethod
+	def _strip_text(text):
+		"""
+		Removes from a text node the whitespace that would have been stripped between tags (and escaped angle brackets)
+		by the regular expression previously applied to the serialized tree.
+
+		:param str or None text: Text or tail of an element
+		:return: Text as it would be after being stripped and parsed again
+		:rtype: str or None
+		"""
+		if not text:
+			return text
+		if '<' in text or '>' in text:
+			text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+			text = RDFWriter._whitespace_regex.sub(r'\g<1>\g<3>', '>' + text + '<')[1:-1]
+			text = text.replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&')
+		elif not text.strip(const.RDF_WRITER_WHITESPACE):
+			return ''
+		if '\r' in text:
+			text = text.replace('\r\n', '\n').replace('\r', '\n')
+		return text
+
+	@staticmethod
+	def _strip_attribute(value):
+		"""
+		Removes from an attribute value the whitespace between escaped angle brackets that would have been stripped by
+		the regular expression previously applied to the serialized tree (tabs and line breaks were kept, as
+		ElementTree escapes them in attributes).
+
+		:param str value: Attribute value
+		:return: Value as it would be after being stripped and parsed again
+		:rtype: str
+		"""
+		if '<' not in value or '>' not in value:
+			return value
+		value = value.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+		value = value.replace('\r', '&#13;').replace('\n', '&#10;').replace('\t', '&#09;')
+		value = RDFWriter._whitespace_regex.sub(r'\g<1>\g<3>', value)
+		value = value.replace('&#13;', '\r').replace('&#10;', '\n').replace('&#09;', '\t')
+		return value.replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&')
+
+	@staticmethod
+	def _escape(data):
+		"""
+		Escapes the characters of a text or attribute value in the same way minidom does.
+
+		:param str data: Text to escape
+		:return: Escaped text
+		:rtype: str
+		"""
+		if '&' in data:
+			data = data.replace('&', '&amp;')
+		if '<' in data:
+			data = data.replace('<', '&lt;')
+		if '"' in data:
+			data = data.replace('"', '&quot;')
+		if '>' in data:
+			data = data.replace('>', '&gt;')
+		return data
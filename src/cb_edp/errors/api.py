@@ -21,19 +21,19 @@ class CouldNotReadRDFError(Exception):
 
 
 class APIProcessError(Exception):
-	def __init__(self, payload=None, message=None, short_message=None):
+	def __init__(self, payload=None, message=None, short_message=None, status_code=None):
 		"""
 		This exception is raised when there is a problem processing the query submitted by the user.
 
-		:param int or None status_code: Response's status code
 		:param str or None payload: Additional information for the response
 		:param str or None message: Custom exception message
 		:param str or None short_message: Custom exception short message
+		:param int or None status_code: Response's status code (500 by default, 400 if the query is not valid)
 		"""
 		Exception.__init__(self)
 		default_message = msg.API_PROCESS_FAILED_ERROR
 		default_short_message = msg.API_PROCESS_FAILED_SHORT_ERROR
 		self.message = message if message else default_message
-		self.status_code = 500
+		self.status_code = status_code if status_code else 500
 		self.payload = payload
 		self.short_message = short_message if short_message else default_short_message
@@ -58,10 +58,12 @@ class NotExpectedValueError(Exception):
 
 		:param str or None field: Name of the field wrong informed
 		:param str or None value: Value of the field
-		:param str or list[str] or None choices: Collection of possible values for the field
+		:param str or list[str] or frozenset[str] or dict or None choices: Collection of possible values for the field
 		:param str or None message: Custom exception message
 		"""
-		if type(choices) is list:
+		if isinstance(choices, (set, frozenset)):
+			choices = sorted(choices)
+		if type(choices) is not str:
 			choices = ', '.join(choices)
 		default_message = msg.NOT_EXPECTED_VALUE_ERROR.format(field=field, value=value, choices=choices)
 		super(NotExpectedValueError, self).__init__(message if message else default_message)
@@ -1,4 +1,5 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 import cb_edp.config.constants as const
 import cb_edp.config.messages as msg
@@ -23,6 +24,8 @@ class Catalogue:
 	:param str uri: URI built by a URL and catalogue's ID.
 	:param list[Dataset] datasets: Collection containing the datasets that will be integrated.
 	"""
+	__slots__ = ('sections', 'title', 'description', 'publisher_name', 'publisher_uri', 'publisher_type',
+				 'publisher_homepage', 'homepage', 'id', 'uri', 'issued', 'datasets')
 
 	def __init__(self, sections):
 		"""
@@ -64,15 +67,25 @@ class Catalogue:
 	def create_datasets(sections):
 		"""
 		Instantiate datasets set by config file. Then it adds them to Catalogue instance.
+		Geometries of the datasets are loaded first in a pool of processes and datasets are built then in a pool of
+		threads. Their IDs are saved once every dataset has been built, in the same order as the sections, so the
+		result does not depend on which dataset finishes first and no ID is saved if any of them fails.
 
 		:param list[str] sections: Sections' name of the dataset to add to the catalogue.
 		:return: Collection of datasets belonging to the catalogue
 		:rtype: list[Dataset]
 		"""
-		datasets = []
-		for section in sections:
-			dataset = Dataset(section)
-			datasets.append(dataset)
+		if len(sections) > 1:
+			datamodels = ConfigManager.get_datamodels()
+			Helpers.preload_spatial_polygons(
+				[Dataset.get_spatial_source(section) for section in sections if section in datamodels])
+			with ThreadPoolExecutor(max_workers=min(len(sections), const.CATALOGUE_DATASETS_WORKERS)) as executor:
+				datasets = list(executor.map(lambda section: Dataset(section, persist_id=False), sections))
+		else:
+			datasets = [Dataset(section, persist_id=False) for section in sections]
+
+		for dataset in datasets:
+			dataset.save_id()
 
 		logging.debug(msg.CATALOGUE_DATASETS_CREATED.format(datasets=len(datasets)))
 		return datasets
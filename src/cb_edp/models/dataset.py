@@ -4,6 +4,7 @@ import cb_edp.config.constants as const
 import cb_edp.config.messages as msg
 from cb_edp.config.constants import Model
 from cb_edp.config.manager import ConfigManager
+from cb_edp.errors.config import SectionKeyError
 from cb_edp.models.resource import Resource
 from cb_edp.utils.helpers import Helpers
 from cb_edp.utils.validators import Validators
@@ -31,19 +32,27 @@ class Dataset:
 	:param str issued: Date when the dataset was created
 	:param str id: Dataset's unique identifier
 	:param str uri: URI built by a URL and dataset's ID
+	:param str resources_license: URL to license information of the resources (shared by all of them)
 	:param list[Resource] resources: Collection containing the resources that belong to the dataset
 	"""
+	__slots__ = ('section', 'service', 'service_path', 'type', 'title', 'description', 'contact_point', 'keywords',
+				 'publisher_name', 'publisher_uri', 'publisher_type', 'publisher_homepage', 'themes', 'access_rights',
+				 'periodicity', 'spatial', 'landing_page', 'allocations', 'id', 'uri', 'issued', 'resources_license',
+				 'resources')
 
-	def __init__(self, section):
+	def __init__(self, section, persist_id=True):
 		"""
 		Initializes Dataset.
 
 		:param str section: Config file section the dataset belongs
+		:param bool persist_id: Whether the ID of the dataset is saved in the datasets IDs store (if not, save_id() has
+		to be called later)
 		"""
 		logging.debug(msg.DATASET_INSTANTIATING_MODEL_START.format(datamodel=section))
 
 		self.section = section
-		Validators.is_expected_value(const.DATAMODEL_SECTION, section, ConfigManager.get_datamodels())
+		if not ConfigManager.is_datamodel(section):
+			Validators.is_expected_value(const.DATAMODEL_SECTION, section, ConfigManager.get_datamodels())
 		self.service = ConfigManager.get_value(section, const.DATAMODEL_FIWARE_SERVICE)
 		self.service_path = ConfigManager.get_value(section, const.DATAMODEL_FIWARE_SERVICE_PATH)
 		self.type = ConfigManager.get_value(section, const.DATAMODEL_TYPE)
@@ -72,24 +81,52 @@ class Dataset:
 		self.periodicity = Helpers.transform_vocabulary(const.DATASET_PERIODICITY,
 														ConfigManager.get_value(section, const.DATASET_PERIODICITY),
 														const.DATASET_FREQUENCY_RELATION)
-		self.spatial = ConfigManager.get_value(section, const.DATASET_SPATIAL)
+		self.spatial, spatial_simplification = Dataset.get_spatial_source(section)
 		if self.spatial:
 			Validators.is_valid_path(const.DATASET_SPATIAL, self.spatial)
-		self.spatial = Helpers.get_spatial_polygon(self.spatial)
+		Validators.is_valid_spatial_simplification(const.DATASET_SPATIAL_SIMPLIFICATION, spatial_simplification)
+		self.spatial = Helpers.get_spatial_polygon(self.spatial, spatial_simplification)
 		self.landing_page = ConfigManager.get_value(section, const.DATASET_LANDING_PAGE)
 		self.allocations = ConfigManager.get_value(section, const.DATASET_ALLOCATION).split()
 		self.id = ConfigManager.get_dataset_id(section)
 		uri_host = ConfigManager.get_value(const.MAIN_SECTION, const.URI_HOST)
 		uri_structure = ConfigManager.get_value(const.MAIN_SECTION, const.URI_STRUCTURE, const.URI_STRUCTURE_DEFAULT)
 		self.uri, self.id = Helpers.generate_uri(uri_host, uri_structure, Model.DATASET, self.id if self.id else None)
-		logging.debug(msg.DATASET_SAVING_ID.format(datamodel=section, id=self.id))
-		ConfigManager.save_dataset_id(section, self.id)
+		if persist_id:
+			self.save_id()
 		self.issued = Helpers.get_issued_date(self.id) if self.id else ''
 
+		self.resources_license = ConfigManager.get_value(section, const.RESOURCE_LICENSE)
 		self.resources = self.create_resources()
 
 		logging.debug(msg.DATASET_INSTANTIATING_MODEL_FINISHED)
 
+	def save_id(self):
+		"""
+		Saves the ID of the dataset in the datasets IDs store.
+
+		:return: None
+		"""
+		logging.debug(msg.DATASET_SAVING_ID.format(datamodel=self.section, id=self.id))
+		ConfigManager.save_dataset_id(self.section, self.id)
+
+	@staticmethod
+	def get_spatial_source(section):
+		"""
+		Reads from the config file where the geometry of a dataset is and how it has to be simplified.
+
+		:param str section: Config file section the dataset belongs
+		:return: GeoJSON file location and simplification (empty if not informed)
+		:rtype: (str, str)
+		:raises SectionKeyError:
+		"""
+		path = ConfigManager.get_value(section, const.DATASET_SPATIAL)
+		try:
+			simplification = ConfigManager.get_value(section, const.DATASET_SPATIAL_SIMPLIFICATION)
+		except SectionKeyError:
+			simplification = ''
+		return path, simplification
+
 	def create_resources(self):
 		"""
 		Instantiate resources set by config file. Then it adds them to Dataset instance.
@@ -100,8 +137,7 @@ class Dataset:
 		if self.type in const.DATAMODELS.keys():
 			datamodels = const.DATAMODELS[self.type]
 		else:
-			datamodels = const.DATAMODELS_DEFAULT
-			datamodels['models'] = [self.type]
+			datamodels = dict(const.DATAMODELS_DEFAULT, models=[self.type])
 
 		resources = []
 		for allocation in self.allocations:
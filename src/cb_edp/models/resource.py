@@ -1,4 +1,5 @@
 import logging
+import sys
 
 import cb_edp.config.constants as const
 import cb_edp.config.messages as msg
@@ -12,56 +13,112 @@ from cb_edp.utils.validators import Validators
 class Resource:
 	"""
 	A class that represents a single instance of a resources of those that will be integrated.
+	Resources only keep what makes them different (their URI and filters): section and license are taken from the
+	dataset they belong to, the description is the same for all of them and title and URL are built from the filters
+	when they are read, as they are only used once when the resource is serialized.
 
+	:param Dataset dataset: Dataset the resource belongs to
+	:param str category: Data Model by which the URL filters
+	:param str or None location: Geographical area by which the URL filters (None if it filters by category)
 	:param str section: Section in the config file where it belongs
 	:param str license: URL to license information
-	:param str rights: Simple text rights information
+	:param str description: Simple text description of the resource
 	:param str title: The resource title
 	:param str url: URL for accessing to context data
 	:param str uri: URI built by a URL and resource's ID
 	"""
+	__slots__ = ('dataset', 'category', 'location', 'uri')
+	description = msg.RESOURCE_DESCRIPTION
 
-	def __init__(self, section):
+	def __init__(self, dataset, category, location=None):
 		"""
 		Initializes Resource.
 
-		:param str section: Config file section the resource belongs
+		:param Dataset dataset: Dataset the resource belongs to
+		:param str category: Data Model by which the URL filters
+		:param str or None location: Geographical area by which the URL filters (None if it filters by category)
 		"""
-		logging.debug(msg.RESOURCE_INSTANTIATING_MODEL_START.format(datamodel=section))
+		logging.debug(msg.RESOURCE_INSTANTIATING_MODEL_START.format(datamodel=dataset.section))
 
-		self.section = section
-		self.license = ConfigManager.get_value(self.section, const.RESOURCE_LICENSE)
+		self.dataset = dataset
+		self.category = sys.intern(category)
+		self.location = location
 		uri_host = ConfigManager.get_value(const.MAIN_SECTION, const.URI_HOST)
 		uri_structure = ConfigManager.get_value(const.MAIN_SECTION, const.URI_STRUCTURE, const.URI_STRUCTURE_DEFAULT)
 		self.uri = Helpers.generate_uri(uri_host, uri_structure, Model.RESOURCE)[0]
-		self.description = msg.RESOURCE_DESCRIPTION
-		self.title = ''
-		self.url = ''
 
 		logging.debug(msg.RESOURCE_INSTANTIATING_MODEL_FINISHED)
 
+	@property
+	def section(self):
+		"""
+		Config file section the resource belongs to.
+
+		:rtype: str
+		"""
+		return self.dataset.section
+
+	@property
+	def license(self):
+		"""
+		URL to license information (the same for every resource of a dataset).
+
+		:rtype: str
+		"""
+		return self.dataset.resources_license
+
+	@property
+	def title(self):
+		"""
+		Title of the resource, built from the Data Model and location it filters by.
+
+		:rtype: str
+		"""
+		datamodel = Helpers.split_uppercase(self.category)
+		if self.location is None:
+			return datamodel
+		return msg.RESOURCE_TITLE_LOCATION.format(datamodel=datamodel, location=self.location)
+
+	@property
+	def url(self):
+		"""
+		Integration API URL for querying the context data of the resource.
+
+		:rtype: str
+		"""
+		filters = {'entity': self.category}
+		if self.location is not None:
+			filters['location'] = self.location
+		return APIBuilder.build_resource_url(self.dataset.service, self.dataset.service_path, **filters)
+
 	@staticmethod
 	def create_resources(dataset, datamodels, allocation):
 		"""
 		Creates a collection of resources based on the configuration set.
+		Solution's API and Orion hosts are validated here, as URLs are not built until they are serialized.
 
 		:param Dataset dataset: Parent of the resources created
 		:param list[str] datamodels: Collection of the Data Models to take into account in the generation
 		:param str allocation: Literal that indicates how the filter will be done
 		:return: Collection of instantiated resources
 		:rtype: list[Resource]
+		:raises WrongFormatError:
 		"""
 		logging.debug(msg.RESOURCE_CREATE_RESOURCES.format(allocation=allocation, datamodels=', '.join(datamodels)))
+		APIBuilder.get_context()
+
+		if allocation == Allocation.LOCATION.value:
+			locations = ConfigManager.get_value(dataset.section, const.RESOURCE_LOCATIONS).split('%')
+			Validators.is_informed(const.RESOURCE_LOCATIONS, locations)
+			locations = [sys.intern(location.strip()) for location in locations]
 
 		resources = []
 		for datamodel in datamodels:
 			if allocation == Allocation.CATEGORY.value:
 				resources.append(Resource.create_resource_by_category(dataset, datamodel))
 			elif allocation == Allocation.LOCATION.value:
-				locations = ConfigManager.get_value(dataset.section, const.RESOURCE_LOCATIONS).split('%')
-				Validators.is_informed(const.RESOURCE_LOCATIONS, locations)
 				for location in locations:
-					resources.append(Resource.create_resource_by_location(dataset, datamodel, location.strip()))
+					resources.append(Resource.create_resource_by_location(dataset, datamodel, location))
 
 		return resources
 
@@ -75,10 +132,7 @@ class Resource:
 		:return: Instantiated dataset.
 		:rtype: Resource
 		"""
-		resource = Resource(dataset.section)
-		resource.title = Helpers.split_uppercase(category)
-		filters = {'entity': category}
-		resource.url = APIBuilder.build_resource_url(dataset.service, dataset.service_path, **filters)
+		resource = Resource(dataset, category)
 		logging.debug(msg.RESOURCE_CREATE_RESOURCE_ENTITY.format(name=resource.title, datamodel=category))
 		return resource
 
@@ -93,12 +147,9 @@ class Resource:
 		:return: Instantiated dataset.
 		:rtype: Resource
 		"""
-		datamodel = Helpers.split_uppercase(category)
-		resource = Resource(dataset.section)
-		resource.title = msg.RESOURCE_TITLE_LOCATION.format(datamodel=datamodel, location=location)
-		filters = {'entity': category, 'location': location}
-		resource.url = APIBuilder.build_resource_url(dataset.service, dataset.service_path, **filters)
+		resource = Resource(dataset, category, location)
 		logging.debug(
 			msg.RESOURCE_CREATE_RESOURCE_LOCATION.format(name=resource.title, datamodel=category, location=location))
-		logging.debug(resource.url)
+		if logging.getLogger().isEnabledFor(logging.DEBUG):
+			logging.debug(resource.url)
 		return resource
@@ -1,9 +1,14 @@
 import base64
 import json
 import logging
+import math
 import os
 import re
+import tempfile
+import threading
 import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 
 from time_uuid import TimeUUID
@@ -19,6 +24,8 @@ class Helpers(object):
 	"""
 	Utilities class.
 	"""
+	__spatial_cache = {}
+	__spatial_lock = threading.Lock()
 
 	@staticmethod
 	def generate_uri(host, structure, dataset_type, uuid=None):
@@ -110,15 +117,20 @@ class Helpers(object):
 		"""
 		if not value:
 			return ''
-		Validators.is_expected_value(field, value, list(vocabulary.keys()))
+		Validators.is_expected_value(field, value, vocabulary)
 		return vocabulary[value]
 
 	@staticmethod
-	def get_spatial_polygon(path):
+	def get_spatial_polygon(path, simplification=''):
 		"""
-		Loads the geometry from a GeoJSON.
+		Loads the geometry from a GeoJSON, simplifying it if requested.
+		Geometries are cached for the whole process by file path and simplification, so a file shared by several Data
+		Models is only read (and simplified) once while it does not change (its modification time and size are checked
+		on every call).
 
 		:param str path: GeoJSON file location.
+		:param str simplification: Tolerance for Douglas-Peucker algorithm, bbox to keep only the bounding box or empty
+		to use the geometry as it is.
 		:return: Tuple which first value is a geometry-like object and the second one a string with geometry coordinates JSON formatted
 		:rtype: (str, str)
 		:raises NotInformedFieldError:
@@ -130,26 +142,227 @@ class Helpers(object):
 			else:
 				return
 
-			with open(path) as file:
-				geojson = json.load(file)
-				if len(geojson['features']) > 1:
-					logging.warning(msg.HELPERS_SPATIAL_GEOJSON_NODES.format(path=path))
+			stat = os.stat(path)
+			signature = (stat.st_mtime_ns, stat.st_size)
+			with Helpers.__spatial_lock:
+				cached = Helpers.__spatial_cache.get((path, simplification))
+			if cached is not None and cached[0] == signature:
+				logging.debug(msg.HELPERS_SPATIAL_CACHE_HIT.format(path=path))
+				return cached[1]
+
+			spatial = Helpers._load_spatial_polygon(path, simplification)
+			with Helpers.__spatial_lock:
+				Helpers.__spatial_cache[(path, simplification)] = (signature, spatial)
+			return spatial
+		except OSError:
+			raise NotInformedFieldError(None, message=msg.HELPERS_SPATIAL_GEOJSON_FILE_NOT_FOUND.format(path=path))
 
-				geometry = geojson['features'][0]['geometry']
-				type = geometry['type']
-				geometry = str(geometry['coordinates'])[1:][:-1]
+	@staticmethod
+	def preload_spatial_polygons(sources):
+		"""
+		Loads at the same time the geometries of several GeoJSON files not cached yet, each one in a different process
+		(encoding and simplifying geometries is CPU bound), so get_spatial_polygon() finds them later in the cache.
+		Files that cannot be loaded are skipped, as get_spatial_polygon() will raise the error when loading them again.
 
-				geometry_json = '"type":"{type}","coordinates":[{coordinates}'.format(type=type,
-																					  coordinates=geometry[:-1])
-				geometry_json = '{' + geometry_json + ']]}'
+		:param list[(str, str)] sources: GeoJSON files locations and their simplification
+		:return: None
+		"""
+		pending = {}
+		for path, simplification in set(sources):
+			try:
+				stat = os.stat(path)
+			except (OSError, ValueError):
+				continue
+			signature = (stat.st_mtime_ns, stat.st_size)
+			with Helpers.__spatial_lock:
+				cached = Helpers.__spatial_cache.get((path, simplification))
+			if cached is None or cached[0] != signature:
+				pending[(path, simplification)] = signature
+		if len(pending) < 2:
+			return
+
+		with ProcessPoolExecutor(max_workers=min(len(pending), os.cpu_count() or 1)) as executor:
+			futures = {source: executor.submit(Helpers._load_spatial_polygon, *source) for source in pending}
+		for source, future in futures.items():
+			try:
+				spatial = future.result()
+			except Exception:
+				continue
+			with Helpers.__spatial_lock:
+				Helpers.__spatial_cache[source] = (pending[source], spatial)
 
-				coordinates = re.sub(r'(,?)\s*\[(-?[\d\.]+),\s*(-?[\d\.]+)\]', '\g<1>\g<2> \g<3>', geometry)
-				coordinates = coordinates.replace('[', '(').replace(']', ')')
-				geometry_object = '{type}({coordinates})'.format(type=type.upper(), coordinates=coordinates)
+	@staticmethod
+	def _load_spatial_polygon(path, simplification=''):
+		"""
+		Reads the geometry of the first feature of a GeoJSON file, simplifies it if requested and encodes it as WKT
+		and as GeoJSON.
 
-				return geometry_object, geometry_json
-		except OSError:
-			raise NotInformedFieldError(None, message=msg.HELPERS_SPATIAL_GEOJSON_FILE_NOT_FOUND.format(path=path))
+		:param str path: GeoJSON file location.
+		:param str simplification: Tolerance for Douglas-Peucker algorithm, bbox to keep only the bounding box or empty
+		to use the geometry as it is.
+		:return: Tuple which first value is a geometry-like object and the second one a string with geometry coordinates
+		JSON formatted
+		:rtype: (str, str)
+		"""
+		with open(path) as file:
+			geojson = json.load(file)
+		if len(geojson['features']) > 1:
+			logging.warning(msg.HELPERS_SPATIAL_GEOJSON_NODES.format(path=path))
+
+		geometry = geojson['features'][0]['geometry']
+		type = geometry['type']
+		coordinates = geometry['coordinates']
+		depth = const.SPATIAL_GEOJSON_DEPTHS.get(type, Helpers._get_coordinates_depth(coordinates))
+
+		if simplification:
+			total = Helpers._count_positions(coordinates, depth)
+			if simplification == const.SPATIAL_SIMPLIFICATION_BBOX:
+				type, coordinates, depth = 'Polygon', Helpers._get_bounding_box(coordinates, depth), 2
+			elif type in const.SPATIAL_SIMPLIFICATION_TYPES:
+				coordinates = Helpers._simplify_coordinates(coordinates, depth, float(simplification),
+															const.SPATIAL_SIMPLIFICATION_TYPES[type])
+			logging.info(msg.HELPERS_SPATIAL_SIMPLIFIED.format(
+				path=path, simplification=simplification, total=total,
+				removed=total - Helpers._count_positions(coordinates, depth)))
+
+		compact_coordinates = json.dumps(coordinates, separators=(',', ':'))
+		geometry_json = const.SPATIAL_GEOJSON_JSON.format(type=type, coordinates=compact_coordinates.replace(',', ', '))
+		geometry_object = '{type}{coordinates}'.format(
+			type=type.upper(), coordinates=Helpers._encode_wkt_coordinates(compact_coordinates, depth))
+		return geometry_object, geometry_json
+
+	@staticmethod
+	def _simplify_coordinates(coordinates, depth, tolerance, rings):
+		"""
+		Simplifies every line (or polygon ring) of some GeoJSON coordinates using Douglas-Peucker algorithm.
+		Rings that would be left with less than the minimum positions a closed ring needs are not simplified.
+
+		:param list coordinates: GeoJSON coordinates
+		:param int depth: Nesting levels above the positions (1 for a single line)
+		:param float tolerance: Maximum distance from a removed position to the simplified line
+		:param bool rings: Whether the lines are polygon rings
+		:return: Simplified coordinates
+		:rtype: list
+		"""
+		if depth == 1:
+			simplified = Helpers._douglas_peucker(coordinates, tolerance)
+			if rings and len(simplified) < const.SPATIAL_SIMPLIFICATION_MIN_RING_POSITIONS:
+				return coordinates
+			return simplified
+		return [Helpers._simplify_coordinates(child, depth - 1, tolerance, rings) for child in coordinates]
+
+	@staticmethod
+	def _douglas_peucker(positions, tolerance):
+		"""
+		Removes from a line the positions closer than a tolerance to the line that joins the positions kept around
+		them (Douglas-Peucker algorithm, measuring the distance to the whole line as the original algorithm does).
+		It is implemented with an explicit stack, as long lines would exceed the recursion limit otherwise.
+
+		:param list[list[float]] positions: Positions of the line
+		:param float tolerance: Maximum distance from a removed position to the simplified line
+		:return: Positions kept
+		:rtype: list[list[float]]
+		"""
+		if len(positions) < 3:
+			return positions
+
+		xs = [position[0] for position in positions]
+		ys = [position[1] for position in positions]
+		keep = [False] * len(positions)
+		keep[0] = keep[-1] = True
+		stack = [(0, len(positions) - 1)]
+		while stack:
+			first, last = stack.pop()
+			x1, y1 = xs[first], ys[first]
+			dx, dy = xs[last] - x1, ys[last] - y1
+			length = math.hypot(dx, dy)
+			if length:
+				distances = [abs((x - x1) * dy - (y - y1) * dx) for x, y in
+							 zip(xs[first + 1:last], ys[first + 1:last])]
+				limit = tolerance * length
+			else:
+				distances = [math.hypot(x - x1, y - y1) for x, y in zip(xs[first + 1:last], ys[first + 1:last])]
+				limit = tolerance
+			farthest_distance = max(distances)
+			if farthest_distance > limit:
+				farthest = first + 1 + distances.index(farthest_distance)
+				keep[farthest] = True
+				if farthest - first > 1:
+					stack.append((first, farthest))
+				if last - farthest > 1:
+					stack.append((farthest, last))
+		return [position for position, kept in zip(positions, keep) if kept]
+
+	@staticmethod
+	def _get_bounding_box(coordinates, depth):
+		"""
+		Obtains the bounding box of some GeoJSON coordinates as the coordinates of a polygon.
+
+		:param list coordinates: GeoJSON coordinates
+		:param int depth: Nesting levels above the positions (0 for a single position)
+		:return: Polygon coordinates of the bounding box (counterclockwise, starting at its south-west corner)
+		:rtype: list[list[list[float]]]
+		"""
+		positions = [coordinates]
+		for _ in range(depth):
+			positions = [child for parent in positions for child in parent]
+		west = min(position[0] for position in positions)
+		east = max(position[0] for position in positions)
+		south = min(position[1] for position in positions)
+		north = max(position[1] for position in positions)
+		return [[[west, south], [east, south], [east, north], [west, north], [west, south]]]
+
+	@staticmethod
+	def _count_positions(coordinates, depth):
+		"""
+		Counts the positions of some GeoJSON coordinates.
+
+		:param list coordinates: GeoJSON coordinates
+		:param int depth: Nesting levels above the positions (0 for a single position)
+		:return: Number of positions
+		:rtype: int
+		"""
+		if depth == 0:
+			return 1
+		if depth == 1:
+			return len(coordinates)
+		return sum(Helpers._count_positions(child, depth - 1) for child in coordinates)
+
+	@staticmethod
+	def _encode_wkt_coordinates(compact_coordinates, depth):
+		"""
+		Encodes GeoJSON coordinates in WKT format: numbers of a position are separated by blanks, positions by commas
+		and the rest of levels by a comma and a blank, each of them between parentheses.
+		Coordinates are received already serialized as compact JSON, so every number is formatted only once (for both
+		GeoJSON and WKT geometries) and the WKT is obtained with a few replacements over the whole string.
+
+		:param str compact_coordinates: GeoJSON coordinates serialized without blanks
+		:param int depth: Nesting levels above the positions (0 for a single position)
+		:return: WKT coordinates
+		:rtype: str
+		"""
+		coordinates = compact_coordinates.replace(',', ' ')
+		if depth == 0:
+			return '(' + coordinates[1:-1] + ')'
+		for level in range(depth, -1, -1):
+			coordinates = coordinates.replace(']' * (level + 1) + ' ' + '[' * (level + 1),
+											  ')' * level + (', ' if level else ',') + '(' * level)
+		return '(' * depth + coordinates[depth + 1:-depth - 1] + ')' * depth
+
+	@staticmethod
+	def _get_coordinates_depth(coordinates):
+		"""
+		Counts the nesting levels above the positions of some GeoJSON coordinates.
+
+		:param list coordinates: GeoJSON coordinates
+		:return: Nesting levels (0 for a single position)
+		:rtype: int
+		"""
+		depth = 0
+		while coordinates and isinstance(coordinates[0], list):
+			coordinates = coordinates[0]
+			depth += 1
+		return depth
 
 	@staticmethod
 	def encode_base64_url(url):
@@ -180,6 +393,55 @@ class Helpers(object):
 		url = base64.b64decode(url.encode('ascii'))
 		return url.decode('utf8')
 
+	@staticmethod
+	@contextmanager
+	def open_atomically(path, permissions, mode='wb'):
+		"""
+		Opens for writing a temporary file in the same folder as the path given, which replaces the file at that path
+		once it is closed and synced to disk. If writing fails, the temporary file is removed and the original one is
+		kept.
+
+		:param str path: Path of the file to write
+		:param int permissions: Permissions the file is written with
+		:param str mode: Mode the temporary file is opened with ('w' for UTF-8 text or 'wb' for binary)
+		:return: Temporary file opened
+		:rtype: io.TextIOWrapper or io.BufferedWriter
+		"""
+		folder, name = os.path.split(path)
+		descriptor, temporary_path = tempfile.mkstemp(dir=folder, prefix='.{name}.'.format(name=name))
+		os.close(descriptor)
+		try:
+			with open(temporary_path, mode, encoding='utf8' if 'b' not in mode else None) as file:
+				yield file
+				file.flush()
+				os.fsync(file.fileno())
+			os.chmod(temporary_path, permissions)
+			os.replace(temporary_path, path)
+		except:
+			os.remove(temporary_path)
+			raise
+		Helpers.sync_folder(folder)
+
+	@staticmethod
+	def sync_folder(folder):
+		"""
+		Flushes to disk the entries of a folder, so a file renamed into it survives a system crash.
+		Platforms that cannot open folders (e.g. Windows) are skipped.
+
+		:param str folder: Path of the folder
+		:return: None
+		"""
+		try:
+			descriptor = os.open(folder, os.O_RDONLY)
+		except OSError:
+			return
+		try:
+			os.fsync(descriptor)
+		except OSError:
+			pass
+		finally:
+			os.close(descriptor)
+
 	@staticmethod
 	def get_project_root():
 		"""
@@ -210,6 +472,16 @@ class Helpers(object):
 		"""
 		return Helpers.get_project_root() + const.CONFIG_FILE_DATASETS_IDS_PATH
 
+	@staticmethod
+	def get_datasets_ids_database_path():
+		"""
+		Returns dataset IDs database path (used when the SQLite store is chosen in config file).
+
+		:return: Path to database file
+		:rtype: str
+		"""
+		return Helpers.get_project_root() + const.CONFIG_FILE_DATASETS_IDS_DATABASE_PATH
+
 	@staticmethod
 	def get_config_file_template_path():
 		"""
@@ -229,3 +501,14 @@ class Helpers(object):
 		:rtype: str
 		"""
 		return Helpers.get_project_root() + const.RDF_FILE_PATH
+
+	@staticmethod
+	def get_compressed_rdf_paths():
+		"""
+		Returns the paths of the compressed versions of the output RDF file by content encoding.
+
+		:return: Path to each compressed RDF file
+		:rtype: dict[str, str]
+		"""
+		rdf_path = Helpers.get_rdf_path()
+		return {encoding: rdf_path + extension for encoding, extension in const.RDF_FILE_ENCODINGS.items()}
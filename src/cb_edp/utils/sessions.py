@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import cb_edp.config.constants as const
+import cb_edp.config.messages as msg
+from cb_edp.config.manager import ConfigManager
+
+try:
+	import aiohttp
+except ImportError:
+	aiohttp = None
+
+
+class SessionManager:
+	"""
+	HTTP sessions manager class. It keeps a pooled keep-alive session for each host the solution talks to, so
+	consecutive calls to the same Orion (or API) instance reuse their TCP connections and TLS handshakes. Sessions are
+	bound to the process that created them and rebuilt after a fork (as it happens with Gunicorn workers).
+	"""
+	__sessions = {}
+	__settings = None
+	__pid = None
+	__lock = threading.Lock()
+
+	@classmethod
+	def request(cls, method, url, **kwargs):
+		"""
+		Makes an HTTP request through the session of the host in the URL, logging how long it took.
+
+		:param str method: HTTP method used in the request
+		:param str url: URL where the call is made
+		:param kwargs: Additional arguments for requests (e.g. headers)
+		:return: Response to the request
+		:rtype: requests.Response
+		"""
+		session = cls.get_session(url)
+		settings = cls.get_settings()
+		kwargs.setdefault('timeout', (settings[const.API_SESSION_CONNECT_TIMEOUT],
+									  settings[const.API_SESSION_READ_TIMEOUT]))
+
+		start = time.perf_counter()
+		response = session.request(method, url, **kwargs)
+		logging.info(msg.SESSIONS_REQUEST_LATENCY.format(method=method.upper(), url=url, status=response.status_code,
+														 time=(time.perf_counter() - start) * 1000))
+		return response
+
+	@classmethod
+	def get_session(cls, url):
+		"""
+		Returns the session for the host of a given URL, creating it if it does not exist in current process yet.
+
+		:param str url: URL (or host) which the session is wanted for
+		:return: Session keeping the connections pool to the host
+		:rtype: requests.Session
+		"""
+		url_parsed = urlparse(url)
+		host = '{scheme}://{netloc}'.format(scheme=url_parsed.scheme, netloc=url_parsed.netloc)
+		with cls.__lock:
+			if cls.__pid != os.getpid():
+				cls.__sessions = {}
+				cls.__pid = os.getpid()
+			if host not in cls.__sessions:
+				logging.debug(msg.SESSIONS_NEW_SESSION.format(host=host))
+				cls.__sessions[host] = cls._build_session(cls.get_settings())
+			return cls.__sessions[host]
+
+	@classmethod
+	def get_settings(cls):
+		"""
+		Reads from the API section of the config file the settings used to build the sessions (only the first time).
+
+		:return: Sessions settings by key name
+		:rtype: dict
+		"""
+		if cls.__settings is None:
+			cls.__settings = {
+				const.API_SESSION_POOL_SIZE: ConfigManager.get_api_value(const.API_SESSION_POOL_SIZE,
+																		 const.API_SESSION_POOL_SIZE_DEFAULT),
+				const.API_SESSION_ASYNC_POOL_SIZE: ConfigManager.get_api_value(
+					const.API_SESSION_ASYNC_POOL_SIZE, const.API_SESSION_ASYNC_POOL_SIZE_DEFAULT),
+				const.API_SESSION_KEEP_ALIVE: ConfigManager.get_api_value(const.API_SESSION_KEEP_ALIVE,
+																		  const.API_SESSION_KEEP_ALIVE_DEFAULT),
+				const.API_SESSION_CONNECT_TIMEOUT: ConfigManager.get_api_value(const.API_SESSION_CONNECT_TIMEOUT,
+																			   const.API_SESSION_CONNECT_TIMEOUT_DEFAULT),
+				const.API_SESSION_READ_TIMEOUT: ConfigManager.get_api_value(const.API_SESSION_READ_TIMEOUT,
+																			const.API_SESSION_READ_TIMEOUT_DEFAULT),
+				const.API_SESSION_RETRIES: ConfigManager.get_api_value(const.API_SESSION_RETRIES,
+																	   const.API_SESSION_RETRIES_DEFAULT),
+				const.API_SESSION_RETRY_BACKOFF: ConfigManager.get_api_value(const.API_SESSION_RETRY_BACKOFF,
+																			 const.API_SESSION_RETRY_BACKOFF_DEFAULT)
+			}
+		return cls.__settings
+
+	@staticmethod
+	def is_timeout(error):
+		"""
+		Checks if a request failed because Orion took too long to answer (even after retrying it).
+
+		:param requests.RequestException error: Error raised by the request
+		:return: If the request timed out
+		:rtype: bool
+		"""
+		if isinstance(error, requests.Timeout):
+			return True
+		return bool(error.args) and isinstance(getattr(error.args[0], 'reason', None), urllib3.exceptions.TimeoutError)
+
+	@staticmethod
+	def _build_session(settings):
+		"""
+		Builds a session whose connections pool is limited by the settings given.
+		Only idempotent requests are retried (with exponential backoff) on connection errors and gateway errors.
+
+		:param dict settings: Sessions settings by key name
+		:return: New session
+		:rtype: requests.Session
+		"""
+		retry = Retry(total=settings[const.API_SESSION_RETRIES],
+					  backoff_factor=settings[const.API_SESSION_RETRY_BACKOFF],
+					  status_forcelist=const.API_SESSION_RETRY_STATUSES, raise_on_status=False)
+		adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings[const.API_SESSION_POOL_SIZE],
+							  pool_block=True, max_retries=retry)
+
+		session = requests.Session()
+		session.mount('http://', adapter)
+		session.mount('https://', adapter)
+		if not settings[const.API_SESSION_KEEP_ALIVE]:
+			session.headers['Connection'] = 'close'
+		return session
+
+
+class AsyncSessionManager:
+	"""
+	Asynchronous HTTP session manager class used by the asyncio version of the API. It keeps a single pooled keep-alive
+	session shared by every request of the event loop, so hundreds of calls to Orion can be in flight at the same time
+	without holding a thread each. The session is bound to the event loop that created it and rebuilt when the loop
+	changes (as it happens with each Gunicorn worker). It uses the same settings as SessionManager, except for the
+	size of the connections pool.
+	"""
+	__session = None
+	__loop = None
+
+	@classmethod
+	async def request(cls, method, url, **kwargs):
+		"""
+		Makes an HTTP request through the shared session, logging how long it took. The whole content is read before
+		returning the response, so its connection goes back to the pool straight away.
+		Requests are retried (with exponential backoff) on connection errors and gateway errors, as sessions do.
+
+		:param str method: HTTP method used in the request
+		:param str url: URL where the call is made
+		:param kwargs: Additional arguments for aiohttp (e.g. headers)
+		:return: Response to the request (its content is available through read())
+		:rtype: aiohttp.ClientResponse
+		:raises aiohttp.ClientError asyncio.TimeoutError:
+		"""
+		session = cls.get_session()
+		settings = SessionManager.get_settings()
+		retries = settings[const.API_SESSION_RETRIES]
+
+		start = time.perf_counter()
+		for retry in range(retries + 1):
+			try:
+				response = await session.request(method, url, **kwargs)
+				await response.read()
+				if retry == retries or response.status not in const.API_SESSION_RETRY_STATUSES:
+					break
+				error = response.status
+			except (aiohttp.ClientError, asyncio.TimeoutError) as request_error:
+				if retry == retries:
+					raise
+				error = request_error
+			backoff = settings[const.API_SESSION_RETRY_BACKOFF] * (2 ** retry)
+			logging.debug(msg.SESSIONS_REQUEST_RETRY.format(method=method.upper(), url=url, error=error, time=backoff))
+			await asyncio.sleep(backoff)
+
+		logging.info(msg.SESSIONS_REQUEST_LATENCY.format(method=method.upper(), url=url, status=response.status,
+														 time=(time.perf_counter() - start) * 1000))
+		return response
+
+	@classmethod
+	def get_session(cls):
+		"""
+		Returns the session of the running event loop, creating it if it does not exist yet.
+
+		:return: Session keeping the connections pool
+		:rtype: aiohttp.ClientSession
+		:raises ImportError:
+		"""
+		if aiohttp is None:
+			raise ImportError(msg.SESSIONS_ASYNC_SESSION_NOT_AVAILABLE)
+		loop = asyncio.get_event_loop()
+		if cls.__session is None or cls.__loop is not loop:
+			cls.__session = cls._build_session(SessionManager.get_settings())
+			cls.__loop = loop
+		return cls.__session
+
+	@classmethod
+	async def close(cls):
+		"""
+		Closes the session of the running event loop (if any) and its connections.
+
+		:return: None
+		"""
+		if cls.__session is not None and cls.__loop is asyncio.get_event_loop():
+			await cls.__session.close()
+		cls.__session = None
+		cls.__loop = None
+
+	@staticmethod
+	def _build_session(settings):
+		"""
+		Builds a session whose connections pool is limited by the settings given.
+
+		:param dict settings: Sessions settings by key name
+		:return: New session
+		:rtype: aiohttp.ClientSession
+		"""
+		connections = settings[const.API_SESSION_ASYNC_POOL_SIZE]
+		logging.debug(msg.SESSIONS_NEW_ASYNC_SESSION.format(connections=connections))
+		connector = aiohttp.TCPConnector(limit=connections, force_close=not settings[const.API_SESSION_KEEP_ALIVE])
+		timeout = aiohttp.ClientTimeout(sock_connect=settings[const.API_SESSION_CONNECT_TIMEOUT],
+										sock_read=settings[const.API_SESSION_READ_TIMEOUT])
+		return aiohttp.ClientSession(connector=connector, timeout=timeout)
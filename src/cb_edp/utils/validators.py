@@ -1,6 +1,8 @@
 import os
 import re
+from functools import lru_cache
 
+import cb_edp.config.constants as const
 from cb_edp.errors.config import NotExpectedValueError
 from cb_edp.errors.config import NotInformedFieldError
 from cb_edp.errors.config import WrongFormatError
@@ -12,6 +14,7 @@ class Validators(object):
 	"""
 	Utilities class that implements static validators methods to use in the project.
 	"""
+	_url_regex = re.compile(const.VALIDATORS_URL_REGEX, re.IGNORECASE)
 
 	@staticmethod
 	def is_informed(field, value):
@@ -39,17 +42,22 @@ class Validators(object):
 		if not value:
 			return
 
-		regex = re.compile(
-			r'^(?:http|ftp)s?://'
-			r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|'
-			r'localhost|'
-			r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'
-			r'(?::\d+)?'
-			r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-
-		if re.match(regex, value) is None:
+		if not Validators._matches_url(value):
 			raise WrongFormatError(field, value)
 
+	@staticmethod
+	@lru_cache(maxsize=const.VALIDATORS_CACHE_SIZE)
+	def _matches_url(value):
+		"""
+		Matches a value against the URL regular expression. Results are memoized, as the same hosts and URIs are
+		checked for many datasets.
+
+		:param str value: Value to check
+		:return: Whether the value is a URL
+		:rtype: bool
+		"""
+		return Validators._url_regex.match(value) is not None
+
 	@staticmethod
 	def is_valid_path(field, value):
 		"""
@@ -60,18 +68,53 @@ class Validators(object):
 		:return: None
 		:raises WrongFormatError:
 		"""
-		import os
 		if not os.path.exists(value):
 			raise WrongFormatError(field, value)
 
+	@staticmethod
+	def is_valid_spatial_simplification(field, value):
+		"""
+		Checks if a given value is either the bounding box mode or a positive tolerance to simplify a geometry. If not,
+		raises an exception.
+
+		:param str field: Field name which the simplification belongs to
+		:param str value: Simplification to check
+		:return: None
+		:raises WrongFormatError:
+		"""
+		if not value or value == const.SPATIAL_SIMPLIFICATION_BBOX:
+			return
+
+		try:
+			tolerance = float(value)
+		except ValueError:
+			raise WrongFormatError(field, value)
+		if not 0 < tolerance < float('inf'):
+			raise WrongFormatError(field, value)
+
+	@staticmethod
+	def is_positive_number(field, value):
+		"""
+		Checks if a given number is at least one. If not, raises an exception.
+
+		:param str field: Name of the field in configuration file
+		:param int value: Number to check
+		:return: None
+		:raises WrongFormatError:
+		"""
+		if value < 1:
+			raise WrongFormatError(field, value)
+
 	@staticmethod
 	def is_expected_value(field, value, choices):
 		"""
 		Check if a specific value appears inside a collection of possible choices. If not, raises an exception.
+		Choices should be hashed collections (sets or dicts) whenever possible, so the check does not depend on how
+		many choices there are.
 
 		:param str field: Name of the field in configuration file
 		:param str value: Value of the field set in configuration file
-		:param str or list[str] or dict choices: Available possibilities for the field
+		:param str or list[str] or frozenset[str] or dict choices: Available possibilities for the field
 		:return: None
 		:raises NotExpectedValueError:
 		"""